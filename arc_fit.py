@@ -0,0 +1,128 @@
+# arc_fit.py
+#
+# Description:
+#   Finds runs of points in a polyline that lie on a circular arc, so they can be sent to
+#   the plotter as a single G2/G3 move instead of many G1 moves. Arcs are fitted greedily:
+#   from each point the run is grown as far as it still fits a circle within the tolerance.
+
+import numpy as np
+
+# Arcs never sweep more than half a turn, so the controller cannot pick the wrong way round
+MAX_SWEEP = np.pi
+# Circles larger than this (in machine units) are treated as straight lines
+MAX_RADIUS = 10000.0
+# Shorter runs are not worth an arc: one G2/G3 line is as long as two G1 lines
+MIN_ARC_POINTS = 4
+
+
+def circle_through(a, b, c):
+    """
+    Returns the centre of the circle through three points.
+
+    Args:
+        a, b, c (np.array): The points, as (2,) arrays.
+
+    Returns:
+        np.array: The centre, or None if the points are (nearly) collinear.
+    """
+    ab = b - a
+    ac = c - a
+    d = 2.0 * (ab[0] * ac[1] - ab[1] * ac[0])
+    if abs(d) < 1e-12:
+        return None
+    ab2 = ab @ ab
+    ac2 = ac @ ac
+    return a + np.array([ac[1] * ab2 - ab[1] * ac2, ab[0] * ac2 - ac[0] * ab2]) / d
+
+
+def fit_arc(points, first, last, tolerance):
+    """
+    Checks whether points[first:last + 1] can be drawn as one arc.
+
+    Every point must lie within the tolerance of the circle, every chord between them must
+    bulge less than the tolerance away from it, the points must all turn the same way,
+    and the arc may not sweep more than MAX_SWEEP.
+
+    Args:
+        points (np.array): (N, 2) array of points.
+        first (int): Index of the first point of the run.
+        last (int): Index of the last point of the run.
+        tolerance (float): Maximum distance between the polyline and the arc.
+
+    Returns:
+        tuple: (centre, ccw) - The centre of the arc and whether it runs counter-clockwise,
+        or None if the run is not an arc.
+    """
+    run = points[first:last + 1]
+    centre = circle_through(run[0], run[len(run) // 2], run[-1])
+    if centre is None:
+        return None
+    radius = np.hypot(*(run[0] - centre))
+    if radius > MAX_RADIUS:
+        return None
+
+    offsets = run - centre
+    if np.max(np.abs(np.hypot(offsets[:, 0], offsets[:, 1]) - radius)) > tolerance:
+        return None
+
+    # Signed angle swept by each segment
+    cross = offsets[:-1, 0] * offsets[1:, 1] - offsets[:-1, 1] * offsets[1:, 0]
+    dot = (offsets[:-1] * offsets[1:]).sum(axis=1)
+    angles = np.arctan2(cross, dot)
+    ccw = angles[0] > 0
+    if (ccw and np.any(angles <= 0)) or (not ccw and np.any(angles >= 0)):
+        return None
+    if abs(angles.sum()) > MAX_SWEEP:
+        return None
+
+    # Sagitta of each chord: how far the arc bulges away from the straight segment
+    chords = np.hypot(*np.diff(run, axis=0).T)
+    sagitta = radius - np.sqrt(np.maximum(radius * radius - chords * chords / 4, 0))
+    if np.max(sagitta) > tolerance:
+        return None
+    return centre, bool(ccw)
+
+
+def fit_arcs(points, tolerance):
+    """
+    Splits a polyline into straight moves and arcs.
+
+    Args:
+        points (np.array): (N, 2) array of points, in machine coordinates.
+        tolerance (float): Maximum distance between the polyline and the arcs.
+
+    Returns:
+        list: One (end, centre, ccw) tuple per move, where end is the index of the point
+        the move goes to, and centre is None for straight moves.
+    """
+    moves = []
+    start = 0
+    count = len(points)
+    while start < count - 1:
+        # Grow the run exponentially while it fits, then narrow down the longest fit
+        best = None
+        span = MIN_ARC_POINTS - 1
+        high = count
+        while start + span < count:
+            fit = fit_arc(points, start, start + span, tolerance)
+            if fit is None:
+                high = start + span
+                break
+            best = (start + span, fit)
+            span *= 2
+        if best is None:
+            moves.append((start + 1, None, False))
+            start += 1
+            continue
+        low = best[0]
+        while high - low > 1:
+            middle = (low + high) // 2
+            fit = fit_arc(points, start, middle, tolerance)
+            if fit is None:
+                high = middle
+            else:
+                low, best = middle, (middle, fit)
+        end, (centre, ccw) = best
+        moves.append((end, centre, ccw))
+        start = end
+    return moves
@@ -1,22 +1,43 @@
 import turtle
-import math
+
+from attractor_engine import (SYSTEMS, get_derivative, integrate_rk4, integrate_rk45, perturbed_states,
+                              project, rotation_matrix)
+from recording_turtle import draw_polyline
 
 # --- Configuration ---
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
 # Number of steps to calculate and draw
 NUM_STEPS = 15000
-# Drawing scale factor
-SCALE = 10
-# Time step for the simulation. Smaller values are more accurate but slower.
-DT = 0.005
-
-# --- Lorenz Attractor Parameters ---
-# These are the classic values that produce the butterfly-wing shape.
-# Feel free to experiment with them.
-SIGMA = 10.0
-RHO = 28.0
-BETA = 8.0 / 3.0
+# Integration method: 'rk4' takes NUM_STEPS fixed steps of DT, 'rk45' adapts its step
+# size to keep the error below TOLERANCE and covers the same time with fewer points
+METHOD = 'rk4'
+TOLERANCE = 1e-6
+
+# --- Attractor System ---
+# One of 'lorenz', 'rossler', 'aizawa', 'thomas' or 'halvorsen' (see attractor_engine.SYSTEMS)
+SYSTEM = 'lorenz'
+# Parameters that replace the system's classic values, e.g. {'rho': 99.96} for Lorenz.
+# The classic Lorenz values (sigma=10, rho=28, beta=8/3) produce the butterfly-wing shape.
+PARAMETERS = {}
+# Settings left at None use the system's own values (for Lorenz: a time step of 0.005,
+# starting at (0.1, 0, 0), scaled by 10 and shifted down by 250)
+DT = None
+INITIAL_STATE = None
+SCALE = None
+OFFSET = None
+
+# --- Ensemble ---
+# Number of trajectories, started at random points around the initial state
+ENSEMBLE_SIZE = 1
+ENSEMBLE_SPREAD = 0.01
+SEED = 0
+
+# --- Projection ---
+# Rotation of the system in degrees about the x, y and z axes, applied before projecting
+ROTATION = (0, 0, 0)
+# The axes that become the drawing's x and y (0 = x, 1 = y, 2 = z), X-Z by default
+PROJECTION_AXES = (0, 2)
 
 
 # --- Setup the Turtle Environment ---
@@ -24,7 +45,7 @@ def setup_screen():
     """Sets up the turtle screen."""
     screen = turtle.Screen()
     screen.setup(WIDTH, HEIGHT)
-    screen.title("Lorenz Attractor")
+    screen.title(f"{SYSTEM.capitalize()} Attractor")
     # Turn off tracer for maximum drawing speed
     screen.tracer(0)
     return screen
@@ -36,59 +57,79 @@ def setup_turtle():
     t.hideturtle()
     t.speed(0)
     # t.color("#FF5733")  # A nice fiery orange color
-    t.penup()
-    # Initial position of the point in 3D space
-    t.x, t.y, t.z = 0.1, 0.0, 0.0
-    # Move the turtle to the projected 2D starting point
-    t.goto(t.x * SCALE, t.z * SCALE - 250)  # Project onto X-Z plane and center
-    t.pendown()
     return t
 
 
 def draw(t):
-    t.x, t.y, t.z = 0.1, 0.0, 0.0
     t.speed(0)
-    draw_lorenz_attractor(t)
+    draw_attractor(t)
 
 # --- Attractor Logic ---
-def draw_lorenz_attractor(t):
-    """Calculates and draws the Lorenz attractor."""
+def compute_attractor(num_steps=None, dt=None, method=None):
+    """
+    Integrates SYSTEM from its initial state, or an ensemble of ENSEMBLE_SIZE
+    trajectories around it.
+
+    Args:
+        num_steps (int): Number of points (with 'rk45', the most points to produce).
+            Defaults to NUM_STEPS.
+        dt (float): Time step ('rk4'); 'rk45' covers the same num_steps * dt of time.
+            Defaults to DT, or the system's own time step.
+        method (str): 'rk4' or 'rk45'. Defaults to METHOD.
+
+    Returns:
+        np.array: (N, 3) array with the x, y, z coordinates of every point, or
+        (N, ENSEMBLE_SIZE, 3) for an ensemble.
+    """
+    derivative = get_derivative(SYSTEM, **PARAMETERS)
+    system = SYSTEMS[SYSTEM]
+    num_steps = NUM_STEPS if num_steps is None else num_steps
+    dt = dt or DT or system.dt
+    method = METHOD if method is None else method
+
+    initial = INITIAL_STATE or system.initial_state
+    if ENSEMBLE_SIZE > 1:
+        initial = perturbed_states(initial, ENSEMBLE_SIZE, ENSEMBLE_SPREAD, SEED)
+
+    if method == 'rk4':
+        return integrate_rk4(derivative, initial, num_steps, dt)
+    if method == 'rk45':
+        _, trajectory = integrate_rk45(derivative, initial, num_steps * dt, num_steps, TOLERANCE)
+        return trajectory
+    raise ValueError(f"Unknown integration method '{method}'")
+
+
+def project_trajectory(trajectory):
+    """
+    Rotates a trajectory by ROTATION and projects it onto the PROJECTION_AXES plane
+    (X-Z by default), scaled and shifted to fit the window. Any coordinate that is
+    not projected still influences the path but is not directly plotted.
+
+    Args:
+        trajectory (np.array): (..., 3) array of points.
+
+    Returns:
+        np.array: (..., 2) array of points in turtle coordinates.
+    """
+    system = SYSTEMS[SYSTEM]
+    rotation = rotation_matrix(*ROTATION) if any(ROTATION) else None
+    scale = system.scale if SCALE is None else SCALE
+    offset = system.offset if OFFSET is None else OFFSET
+    return project(trajectory, PROJECTION_AXES, rotation, scale, offset)
+
+
+def draw_attractor(t):
+    """Calculates and draws the attractor, one polyline per trajectory."""
     print(f"Generating {NUM_STEPS} steps... This may take a moment.")
 
-    # We will use a simple list to create a color gradient effect
-    colors = ["#FF5733", "#FF8C00", "#FFD700", "#FFFF00"]
-    color_index = 0
-
-    for i in range(NUM_STEPS):
-        # Lorenz system differential equations
-        # These equations describe how the 3D point (x, y, z) moves over time.
-        dx = SIGMA * (t.y - t.x)
-        dy = t.x * (RHO - t.z) - t.y
-        dz = t.x * t.y - BETA * t.z
-
-        # Update the coordinates using Euler's method
-        # This is a simple way to approximate the next point in the system.
-        t.x += dx * DT
-        t.y += dy * DT
-        t.z += dz * DT
-
-        # --- Drawing Logic ---
-        # We are projecting the 3D system onto a 2D plane by using x and z.
-        # The y-coordinate influences the path but is not directly plotted.
-        # We also shift the drawing down to center it better.
-        t.goto(t.x * SCALE, t.z * SCALE - 250)
-
-        # Change color periodically to create a nice visual effect
-        if i % 100 == 0:
-            color_index = (color_index + 1) % len(colors)
-            # t.pencolor(colors[color_index])
-
-        # Update the screen in batches to speed up the drawing
-        # if i % 500 == 0:
-        #    turtle.update()
-
-    # Final update to show the complete drawing
-    # turtle.update()
+    # The whole trajectory is computed first, then drawn as a single polyline
+    points = project_trajectory(compute_attractor())
+    if points.ndim == 2:
+        draw_polyline(t, points)
+    else:
+        for i in range(points.shape[1]):
+            draw_polyline(t, points[:, i])
+
     print("Attractor drawing complete.")
 
 
@@ -97,7 +138,7 @@ if __name__ == "__main__":
     try:
         screen = setup_screen()
         pen = setup_turtle()
-        draw_lorenz_attractor(pen)
+        draw_attractor(pen)
         # Keep the window open until it's clicked
         screen.exitonclick()
     except turtle.Terminator:
@@ -0,0 +1,277 @@
+# attractor_engine.py
+#
+# Description:
+#   Integrates 3D dynamical systems (such as the Lorenz attractor) into NumPy arrays,
+#   separately from any drawing. Two integrators are available: classic fixed-step RK4
+#   and adaptive Dormand-Prince RK45, which takes long steps where the trajectory is
+#   smooth and short ones where it bends.
+#
+#   Derivative functions take the three state components and return their derivatives:
+#   f(x, y, z) -> (dx, dy, dz). The components are plain floats for a single trajectory,
+#   or (M,) arrays to integrate M trajectories (an (M, 3) batch of states) at once.
+#
+#   Systems are looked up by name in SYSTEMS, which also holds their classic parameters,
+#   a starting point, a time step and a view that fits an 800x600 turtle window.
+
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+
+# --- Dormand-Prince 5(4) coefficients (the systems are autonomous, so no time nodes) ---
+DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# Fifth order weights (the last row of DP_A) minus the embedded fourth order weights
+DP_E = (71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def lorenz(x, y, z, sigma=10.0, rho=28.0, beta=8.0 / 3.0):
+    """
+    The Lorenz system.
+
+    Args:
+        x, y, z (float or np.array): The state.
+        sigma, rho, beta (float): The system parameters.
+
+    Returns:
+        tuple: (dx, dy, dz) - The time derivative of the state.
+    """
+    return sigma * (y - x), x * (rho - z) - y, x * y - beta * z
+
+
+def rossler(x, y, z, a=0.2, b=0.2, c=5.7):
+    """The Rössler system, see lorenz for the arguments."""
+    return -y - z, x + a * y, b + z * (x - c)
+
+
+def aizawa(x, y, z, a=0.95, b=0.7, c=0.6, d=3.5, e=0.25, f=0.1):
+    """The Aizawa system, see lorenz for the arguments."""
+    return ((z - b) * x - d * y,
+            d * x + (z - b) * y,
+            c + a * z - z ** 3 / 3 - (x * x + y * y) * (1 + e * z) + f * z * x ** 3)
+
+
+def thomas(x, y, z, b=0.208186):
+    """Thomas' cyclically symmetric system, see lorenz for the arguments."""
+    return np.sin(y) - b * x, np.sin(z) - b * y, np.sin(x) - b * z
+
+
+def halvorsen(x, y, z, a=1.4):
+    """The Halvorsen system, see lorenz for the arguments."""
+    return (-a * x - 4 * y - 4 * z - y * y,
+            -a * y - 4 * z - 4 * x - z * z,
+            -a * z - 4 * x - 4 * y - x * x)
+
+
+# derivative: f(x, y, z, **parameters) -> (dx, dy, dz)
+# parameters: the classic parameter values
+# initial_state: a starting point on (or close to) the attractor
+# dt: a time step that draws smoothly with RK4
+# scale, offset: turtle units per unit of the system and where its origin is drawn
+AttractorSystem = namedtuple('AttractorSystem', ['derivative', 'parameters', 'initial_state', 'dt', 'scale', 'offset'])
+
+SYSTEMS = {
+    'lorenz': AttractorSystem(lorenz, {'sigma': 10.0, 'rho': 28.0, 'beta': 8.0 / 3.0}, (0.1, 0.0, 0.0), 0.005, 10, (0, -250)),
+    'rossler': AttractorSystem(rossler, {'a': 0.2, 'b': 0.2, 'c': 5.7}, (0.1, 0.0, 0.0), 0.02, 15, (0, -100)),
+    'aizawa': AttractorSystem(aizawa, {'a': 0.95, 'b': 0.7, 'c': 0.6, 'd': 3.5, 'e': 0.25, 'f': 0.1}, (0.1, 0.0, 0.0), 0.01, 120, (0, -100)),
+    'thomas': AttractorSystem(thomas, {'b': 0.208186}, (0.1, 0.0, 0.0), 0.05, 50, (-80, -70)),
+    'halvorsen': AttractorSystem(halvorsen, {'a': 1.4}, (-5.0, 0.0, 0.0), 0.005, 20, (50, 50)),
+}
+
+
+def get_derivative(name, **parameters):
+    """
+    Looks up a system and binds its parameters.
+
+    Args:
+        name (str): Name of a system in SYSTEMS.
+        **parameters: Parameter values that replace the classic ones.
+
+    Returns:
+        callable: f(x, y, z) -> (dx, dy, dz).
+    """
+    if name not in SYSTEMS:
+        raise ValueError(f"Unknown attractor '{name}', choose from: {', '.join(SYSTEMS)}")
+    system = SYSTEMS[name]
+    unknown = set(parameters) - set(system.parameters)
+    if unknown:
+        raise ValueError(f"The {name} system has no parameter(s) {', '.join(sorted(unknown))}")
+    return partial(system.derivative, **{**system.parameters, **parameters})
+
+
+def perturbed_states(initial, count, spread, seed=None):
+    """
+    Builds an ensemble of starting points scattered around one state.
+
+    Args:
+        initial (array-like): The (3,) central state, always the first of the ensemble.
+        count (int): Number of states.
+        spread (float): Standard deviation of the random offsets.
+        seed (int): Seed for the random generator, for repeatable ensembles.
+
+    Returns:
+        np.array: (count, 3) array of states.
+    """
+    states = np.empty((count, 3))
+    states[:] = initial
+    states[1:] += np.random.default_rng(seed).normal(0.0, spread, (count - 1, 3))
+    return states
+
+
+def rotation_matrix(x_angle=0.0, y_angle=0.0, z_angle=0.0):
+    """
+    Returns the matrix that rotates points about the x, then the y, then the z axis.
+
+    Args:
+        x_angle, y_angle, z_angle (float): The rotations in degrees.
+
+    Returns:
+        np.array: (3, 3) rotation matrix, to be applied as points @ matrix.T.
+    """
+    a, b, c = np.radians([x_angle, y_angle, z_angle])
+    rx = np.array([[1, 0, 0], [0, np.cos(a), -np.sin(a)], [0, np.sin(a), np.cos(a)]])
+    ry = np.array([[np.cos(b), 0, np.sin(b)], [0, 1, 0], [-np.sin(b), 0, np.cos(b)]])
+    rz = np.array([[np.cos(c), -np.sin(c), 0], [np.sin(c), np.cos(c), 0], [0, 0, 1]])
+    return rz @ ry @ rx
+
+
+def project(points, axes=(0, 2), rotation=None, scale=1.0, offset=(0, 0)):
+    """
+    Projects 3D points onto a plane.
+
+    Args:
+        points (np.array): (..., 3) array of points.
+        axes (tuple): The two axes (0 = x, 1 = y, 2 = z) that become the 2D x and y.
+        rotation (np.array): Optional (3, 3) matrix applied before projecting.
+        scale (float): Factor applied after projecting.
+        offset (tuple): Added after scaling.
+
+    Returns:
+        np.array: (..., 2) array of points.
+    """
+    if rotation is not None:
+        points = points @ np.asarray(rotation).T
+    return points[..., list(axes)] * scale + np.asarray(offset, dtype=float)
+
+
+def _components(initial):
+    """Splits an initial state of shape (3,) or (M, 3) into its three components."""
+    initial = np.asarray(initial, dtype=float)
+    if initial.shape[-1] != 3:
+        raise ValueError("The initial state must have 3 components")
+    if initial.ndim == 1:
+        return tuple(initial.tolist())
+    return tuple(initial[:, i].copy() for i in range(3))
+
+
+def _store(row, state):
+    """Writes a state into a (3,) or (M, 3) row of the output array."""
+    row[..., 0], row[..., 1], row[..., 2] = state
+
+
+def _advance(state, h, coefficients, stages):
+    """Returns state + h * sum(coefficient * stage), skipping zero coefficients."""
+    result = []
+    for i, component in enumerate(state):
+        total = 0.0
+        for coefficient, stage in zip(coefficients, stages):
+            if coefficient:
+                total = total + coefficient * stage[i]
+        result.append(component + h * total)
+    return tuple(result)
+
+
+def integrate_rk4(derivative, initial, num_steps, dt, out=None):
+    """
+    Integrates a system with the classic fourth order Runge-Kutta method.
+
+    Args:
+        derivative (callable): f(x, y, z) -> (dx, dy, dz).
+        initial (array-like): Starting state, (3,) for one trajectory or (M, 3) for M of them.
+        num_steps (int): Number of states to compute, including the starting one.
+        dt (float): Time step.
+        out (np.array): Optional preallocated (num_steps, 3) or (num_steps, M, 3) array.
+
+    Returns:
+        np.array: The trajectory, one state per row.
+    """
+    x, y, z = _components(initial)
+    if out is None:
+        out = np.empty((num_steps,) + np.shape(initial))
+    half = dt / 2
+    sixth = dt / 6
+    _store(out[0], (x, y, z))
+    for i in range(1, num_steps):
+        k1x, k1y, k1z = derivative(x, y, z)
+        k2x, k2y, k2z = derivative(x + half * k1x, y + half * k1y, z + half * k1z)
+        k3x, k3y, k3z = derivative(x + half * k2x, y + half * k2y, z + half * k2z)
+        k4x, k4y, k4z = derivative(x + dt * k3x, y + dt * k3y, z + dt * k3z)
+        x = x + sixth * (k1x + 2 * k2x + 2 * k3x + k4x)
+        y = y + sixth * (k1y + 2 * k2y + 2 * k3y + k4y)
+        z = z + sixth * (k1z + 2 * k2z + 2 * k3z + k4z)
+        _store(out[i], (x, y, z))
+    return out
+
+
+def integrate_rk45(derivative, initial, duration, max_points, tolerance=1e-6, first_step=1e-3, out=None):
+    """
+    Integrates a system with the adaptive Dormand-Prince method, keeping the estimated
+    error of each step below the tolerance. Every accepted step becomes one output row,
+    so the points are dense where the trajectory bends and sparse where it is smooth.
+    When several trajectories are integrated together they share the same steps.
+
+    Args:
+        derivative (callable): f(x, y, z) -> (dx, dy, dz).
+        initial (array-like): Starting state, (3,) for one trajectory or (M, 3) for M of them.
+        duration (float): Length of time to integrate over.
+        max_points (int): Size of the output; integration stops early when it is full.
+        tolerance (float): Relative (and absolute) error allowed per step.
+        first_step (float): Size of the first attempted step.
+        out (np.array): Optional preallocated (max_points, 3) or (max_points, M, 3) array.
+
+    Returns:
+        tuple: (times, states) - The time of every output row and the trajectory, both
+        trimmed to the rows that were filled.
+    """
+    state = _components(initial)
+    if out is None:
+        out = np.empty((max_points,) + np.shape(initial))
+    times = np.empty(max_points)
+    times[0] = 0.0
+    _store(out[0], state)
+
+    t = 0.0
+    h = first_step
+    count = 1
+    first_stage = derivative(*state)
+    while t < duration and count < max_points:
+        h = min(h, duration - t)
+        # The first stage of a step is the last stage of the step before it
+        k = [first_stage]
+        for stage in range(1, 6):
+            k.append(derivative(*_advance(state, h, DP_A[stage], k)))
+        new_state = _advance(state, h, DP_A[6], k)
+        k.append(derivative(*new_state))
+
+        error = 0.0
+        for old, new, estimate in zip(state, new_state, _advance((0, 0, 0), h, DP_E, k)):
+            scale = tolerance * (1 + np.maximum(np.abs(old), np.abs(new)))
+            error = max(error, float(np.max(np.abs(estimate) / scale)))
+
+        if error <= 1:
+            t += h
+            state = new_state
+            first_stage = k[6]
+            times[count] = t
+            _store(out[count], state)
+            count += 1
+        # Standard step size controller for a fifth order method
+        h *= min(5.0, max(0.2, 0.9 * max(error, 1e-10) ** -0.2))
+    return times[:count], out[:count]
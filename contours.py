@@ -0,0 +1,216 @@
+# contours.py
+#
+# Description:
+#   Turns escape-time images (arrays of iteration counts) into line drawings for the
+#   plotter. Contours are traced with marching squares, as whole-array NumPy operations:
+#   every cell of the grid is classified at once, and the resulting segments are chained
+#   into polylines through the grid edges they share, without a Python loop over cells or
+#   segments. The polylines are then simplified with simplify.py.
+
+import numpy as np
+
+from simplify import simplify_drawing
+
+
+def _segment_table():
+    """
+    Builds the marching squares lookup table.
+
+    The corners of a cell are numbered clockwise from the top left (as seen in the image),
+    and edge k runs from corner k to corner k + 1. Segments are oriented so the corners
+    above the level are always on their left, which makes the segments of one contour
+    follow each other head to tail.
+
+    Returns:
+        np.array: (32, 2, 2) array of (start edge, end edge) pairs, -1 where a cell has
+        fewer than two segments. Rows 0-15 are for cells whose centre is below the level,
+        rows 16-31 for cells whose centre is above it (this only matters for saddles).
+    """
+    table = np.full((32, 2, 2), -1, dtype=np.int64)
+    for case in range(16):
+        above = [(case >> corner) & 1 for corner in range(4)]
+        rising = [edge for edge in range(4) if not above[edge] and above[(edge + 1) % 4]]
+        for centre in (0, 1):
+            for slot, start in enumerate(rising):
+                if len(rising) == 2 and centre:
+                    # Saddle joined through the centre: cut off the corner below the level
+                    end = (start - 1) % 4
+                else:
+                    # Otherwise cut off the corners above it, up to the next falling edge
+                    end = next((start + step) % 4 for step in range(1, 4)
+                               if above[(start + step) % 4] and not above[(start + step + 1) % 4])
+                table[case + 16 * centre, slot] = (start, end)
+    return table
+
+
+SEGMENT_TABLE = _segment_table()
+
+
+def _edge_points(field, level, edges):
+    """
+    Computes where a contour crosses grid edges, by linear interpolation.
+
+    Args:
+        field (np.array): (H, W) array of values.
+        level (float): The contour level.
+        edges (np.array): Edge ids: H * (W - 1) horizontal edges (row by row), then
+            (H - 1) * W vertical ones.
+
+    Returns:
+        np.array: (N, 2) array of (column, row) positions.
+    """
+    height, width = field.shape
+    horizontal = edges < height * (width - 1)
+    row = np.where(horizontal, edges // (width - 1), (edges - height * (width - 1)) // width)
+    col = np.where(horizontal, edges % (width - 1), (edges - height * (width - 1)) % width)
+    low = field[row, col]
+    high = field[row + ~horizontal, col + horizontal]
+    t = (level - low) / (high - low)
+
+    points = np.empty((len(edges), 2))
+    points[:, 0] = col + horizontal * t
+    points[:, 1] = row + ~horizontal * t
+    return points
+
+
+def contour_segments(field, level):
+    """
+    Finds the contour segments of every grid cell (marching squares).
+
+    Args:
+        field (np.array): (H, W) array of values.
+        level (float): The contour level, best chosen between the values of the field.
+
+    Returns:
+        tuple: (starts, ends) - Edge ids (see _edge_points) each segment runs between.
+    """
+    height, width = field.shape
+    above = field > level
+    top_left, top_right = above[:-1, :-1], above[:-1, 1:]
+    bottom_right, bottom_left = above[1:, 1:], above[1:, :-1]
+    case = (top_left.astype(np.int64) | top_right << 1 | bottom_right << 2 | bottom_left << 3)
+
+    # Only saddles (cases 5 and 10) need the value at the centre of the cell
+    cells = np.flatnonzero((case != 0) & (case != 15))
+    case = case.ravel()[cells]
+    rows, cols = np.divmod(cells, width - 1)
+    saddle = (case == 5) | (case == 10)
+    centre = np.zeros(len(cells), dtype=bool)
+    r, c = rows[saddle], cols[saddle]
+    centre[saddle] = (field[r, c] + field[r, c + 1] + field[r + 1, c] + field[r + 1, c + 1]) / 4 > level
+
+    # Ids of the top, right, bottom and left edge of every cell
+    vertical = height * (width - 1)
+    cell_edges = np.stack([
+        rows * (width - 1) + cols,
+        vertical + rows * width + cols + 1,
+        (rows + 1) * (width - 1) + cols,
+        vertical + rows * width + cols,
+    ], axis=1)
+
+    pairs = SEGMENT_TABLE[case + 16 * centre] # (cells, slot, start/end)
+    starts, ends = [], []
+    for slot in range(2):
+        present = pairs[:, slot, 0] >= 0
+        starts.append(np.take_along_axis(cell_edges[present], pairs[present, slot, :1], axis=1)[:, 0])
+        ends.append(np.take_along_axis(cell_edges[present], pairs[present, slot, 1:], axis=1)[:, 0])
+    return np.concatenate(starts), np.concatenate(ends)
+
+
+def link_segments(starts, ends):
+    """
+    Chains oriented segments into polylines, where one segment ends on the edge the next
+    one starts on. Closed loops are cut open at their lowest numbered segment and closed
+    again by repeating their first point at the end.
+
+    The chains are ordered by list ranking (pointer jumping): every round each segment
+    adds the distance of the segment it points to and then points twice as far, so
+    log2(N) whole-array rounds find every segment's chain and position.
+
+    Args:
+        starts (np.array): Edge id each segment starts on.
+        ends (np.array): Edge id each segment ends on.
+
+    Returns:
+        list: One array of edge ids per polyline, the points it passes through in order.
+    """
+    count = len(starts)
+    if count == 0:
+        return []
+    index = np.arange(count)
+    order = np.argsort(starts)
+    found = np.minimum(np.searchsorted(starts[order], ends), count - 1)
+    successor = np.where(starts[order][found] == ends, order[found], -1)
+    rounds = max(1, int(np.ceil(np.log2(count))) + 1)
+
+    # Segments on a loop never reach a segment without successor, find each loop's lowest one
+    pointer = np.where(successor < 0, index, successor)
+    lowest = index.copy()
+    for _ in range(rounds):
+        lowest = np.minimum(lowest, lowest[pointer])
+        pointer = pointer[pointer]
+    looped = successor[pointer] >= 0
+    successor[looped & (successor == lowest)] = -1
+
+    # Distance of every segment to the last one of its chain
+    pointer = np.where(successor < 0, index, successor)
+    distance = (successor >= 0).astype(np.int64)
+    for _ in range(rounds):
+        distance += distance[pointer]
+        pointer = pointer[pointer]
+
+    order = np.lexsort((-distance, pointer))
+    chain = pointer[order]
+    last = np.flatnonzero(np.append(chain[1:] != chain[:-1], True))
+    # Every chain passes through the start of each segment, then the end of its last one
+    points = np.insert(starts[order], last + 1, ends[order[last]])
+    return np.split(points, (last + np.arange(1, len(last) + 1))[:-1] + 1)
+
+
+def field_contours(field, level):
+    """
+    Traces the contours of a field at one level.
+
+    Args:
+        field (np.array): (H, W) array of values.
+        level (float): The contour level.
+
+    Returns:
+        list: (N, 2) arrays of (column, row) points, one per contour.
+    """
+    field = np.asarray(field, dtype=float)
+    if min(field.shape) < 2:
+        return []
+    starts, ends = contour_segments(field, level)
+    chains = link_segments(starts, ends)
+    if not chains:
+        return []
+    points = _edge_points(field, level, np.concatenate(chains))
+    return np.split(points, np.cumsum([len(edges) for edges in chains])[:-1])
+
+
+def iteration_contours(counts, iterations, tolerance=0.25, scale=1.0):
+    """
+    Traces the outlines of the regions that take at least a given number of iterations
+    to escape, ready to draw with the turtle.
+
+    Args:
+        counts (np.array): (H, W) array of iteration counts, first row at the top.
+        iterations (list): Iteration counts to outline; n traces the border between points
+            that escape in fewer than n iterations and the rest.
+        tolerance (float): Simplification tolerance in pixels (0 keeps every point).
+        scale (float): Turtle units per pixel.
+
+    Returns:
+        tuple: (polylines, report) - (N, 2) arrays in turtle coordinates centred on the
+        image with y pointing up, and the point and stroke counts from simplify_drawing.
+    """
+    height, width = np.shape(counts)
+    polylines = []
+    for n in iterations:
+        polylines.extend(field_contours(counts, n - 0.5))
+    polylines, report = simplify_drawing(polylines, tolerance)
+
+    centre = np.array([(width - 1) / 2, (height - 1) / 2])
+    flip = np.array([scale, -scale])
+    return [(points - centre) * flip for points in polylines], report
@@ -0,0 +1,387 @@
+# deep_zoom.py
+#
+# Description:
+#   Renders zoom sequences into the Mandelbrot set. Every frame is rendered progressively,
+#   coarse passes first, and is built from square tiles that are cached, so consecutive
+#   frames of a zoom (which overlap) only compute the tiles that are new.
+#
+#   Pixels are sampled on power-of-two lattices: at level L a pixel is 2**-L wide and
+#   lattice point (k, j) is the complex number (k + j*i) * 2**-L. A tile is identified by
+#   its level and position on the lattice, so the same tile is found again by any frame
+#   that needs it, whatever its exact centre and width.
+#
+#   Once float64 rounding starts to change the counts, tiles are computed with
+#   perturbation theory: one reference orbit per frame is iterated in integer fixed-point
+#   arithmetic, with GUARD_BITS more fractional bits than the lattice needs, and every
+#   pixel only iterates its (small) difference from that orbit in float64 NumPy.
+#   The zoom depth is limited by the float64 exponent, to widths of about 1e-300.
+#
+# Usage:
+#   python deep_zoom.py --center <re> <im> [--span 3] [--zoom 2] [--frames 40]
+#                       [--size 400 300] [--max-iter 1000] [--out frames/]
+#
+#   The centre is given as decimal strings, with as many digits as the zoom needs.
+
+import argparse
+import math
+import os
+from collections import OrderedDict
+from fractions import Fraction
+from functools import lru_cache
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from mandelbrot import mandelbrot_grid
+
+# Width and height of a cached tile in pixels
+TILE_SIZE = 64
+# Levels deeper than this (pixels narrower than about 1.5e-8) use perturbation: beyond it,
+# rounding errors in float64 orbits grow enough to change the counts of slowly escaping points
+PERTURBATION_LEVEL = 26
+# Extra bits of the reference orbit beyond the pixel size
+GUARD_BITS = 64
+
+class TileCache:
+    """
+    Keeps the most recently used tiles in memory, keyed by (level, column, row, max_iter).
+    The level sets the resolution, the column and row place the tile on the lattice.
+    """
+    def __init__(self, max_tiles=2048):
+        """
+        Parameters:
+        max_tiles (int): Number of tiles kept before the least recently used are dropped.
+        """
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns a cached tile and marks it as recently used, or None on a miss."""
+        tile = self.tiles.get(key)
+        if tile is None:
+            self.misses += 1
+            return None
+        self.tiles.move_to_end(key)
+        self.hits += 1
+        return tile
+
+    def put(self, key, tile):
+        """Stores a tile, dropping the least recently used ones if the cache is full."""
+        self.tiles[key] = tile
+        self.tiles.move_to_end(key)
+        while len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+
+@lru_cache(maxsize=8)
+def reference_orbit(re, im, level, max_iter):
+    """
+    Iterates z = z*z + c for one lattice point in fixed point, with level + GUARD_BITS
+    fractional bits. c is represented exactly; each product is truncated (rounded toward
+    minus infinity) back to that many bits, far below float64 precision at the level.
+
+    Parameters:
+    re (int): Real lattice coordinate of c.
+    im (int): Imaginary lattice coordinate of c.
+    level (int): Lattice level, c = (re + im*i) * 2**-level.
+    max_iter (int): The maximum number of iterations.
+
+    Returns:
+    np.array: Z_0 = 0, Z_1 = c, ... as complex128, up to max_iter or the first |Z| > 2.
+    """
+    bits = level + GUARD_BITS
+    one = 1 << bits
+    cr = int(re) << GUARD_BITS
+    ci = int(im) << GUARD_BITS
+    escape = 4 << (2 * bits)
+
+    orbit = np.zeros(max_iter + 1, dtype=np.complex128)
+    zr = zi = 0
+    for n in range(1, max_iter + 1):
+        zr, zi = ((zr * zr - zi * zi) >> bits) + cr, ((zr * zi) >> (bits - 1)) + ci
+        orbit[n] = complex(zr / one, zi / one) # int / int rounds correctly to float
+        if zr * zr + zi * zi > escape:
+            return orbit[:n + 1]
+    return orbit
+
+def perturbation_grid(orbit, dc_re, dc_im, max_iter):
+    """
+    Computes Mandelbrot iteration counts from offsets to a reference orbit.
+
+    Each pixel iterates dz = (2*Z + dz)*dz + dc, and is at z = Z + dz. When z gets closer
+    to 0 than dz, or the reference orbit runs out, the pixel is rebased: dz becomes z and
+    it continues from the start of the reference orbit. This keeps dz small, so one
+    reference orbit serves every pixel, even ones far from it.
+
+    Parameters:
+    orbit (np.array): Reference orbit from reference_orbit().
+    dc_re (np.array): Real offsets of the grid columns from the reference point.
+    dc_im (np.array): Imaginary offsets of the grid rows from the reference point.
+    max_iter (int): The maximum number of iterations.
+
+    Returns:
+    np.array: (len(dc_im), len(dc_re)) array of iteration counts.
+    """
+    dc = np.empty((len(dc_im), len(dc_re)), dtype=np.complex128)
+    dc.real = dc_re[np.newaxis, :]
+    dc.imag = dc_im[:, np.newaxis]
+    dc = dc.ravel()
+
+    counts = np.full(dc.shape, max_iter, dtype=np.int64)
+    index = np.arange(dc.size) # Flat indices of the points still being iterated
+    dz = np.zeros_like(dc)
+    m = np.zeros(dc.shape, dtype=np.intp) # Position of each point in the reference orbit
+    last = len(orbit) - 1
+
+    for n in range(max_iter):
+        if index.size == 0:
+            break
+        dz *= 2 * orbit[m] + dz
+        dz += dc
+        m += 1
+        z = orbit[m] + dz
+        magnitude = np.abs(z)
+        escaped = ~(magnitude <= 2)
+        if escaped.any():
+            counts[index[escaped]] = n + 1
+            keep = ~escaped
+            index, dc, dz, m, z, magnitude = index[keep], dc[keep], dz[keep], m[keep], z[keep], magnitude[keep]
+        rebase = (magnitude < np.abs(dz)) | (m == last)
+        if rebase.any():
+            dz[rebase] = z[rebase]
+            m[rebase] = 0
+
+    return counts.reshape(len(dc_im), len(dc_re))
+
+def render_tile(level, col, row, max_iter, reference=None):
+    """
+    Computes one tile of the lattice, directly in float64 at shallow levels and with
+    perturbation past PERTURBATION_LEVEL.
+
+    Parameters:
+    level (int): Lattice level.
+    col (int): Tile column, the tile starts at lattice point col * TILE_SIZE.
+    row (int): Tile row, the tile starts at lattice point row * TILE_SIZE.
+    max_iter (int): The maximum number of iterations.
+    reference (tuple): (re, im, level) lattice point of the reference orbit, needed past
+        PERTURBATION_LEVEL. Its level must not be coarser than the tile's.
+
+    Returns:
+    np.array: (TILE_SIZE, TILE_SIZE) array of iteration counts, rows of increasing imaginary part.
+    """
+    steps = np.arange(TILE_SIZE, dtype=np.float64)
+    if level <= PERTURBATION_LEVEL:
+        pixel = 2.0 ** -level
+        x = (col * TILE_SIZE + steps) * pixel
+        y = (row * TILE_SIZE + steps) * pixel
+        return mandelbrot_grid(x, y, max_iter)
+
+    ref_re, ref_im, ref_level = reference
+    shift = ref_level - level
+    orbit = reference_orbit(ref_re, ref_im, ref_level, max_iter)
+    # Offsets of the tile's first pixel from the reference point, exact in integers
+    start_re = ((col * TILE_SIZE) << shift) - ref_re
+    start_im = ((row * TILE_SIZE) << shift) - ref_im
+    dc_re = math.ldexp(start_re, -ref_level) + math.ldexp(1.0, -level) * steps
+    dc_im = math.ldexp(start_im, -ref_level) + math.ldexp(1.0, -level) * steps
+    return perturbation_grid(orbit, dc_re, dc_im, max_iter)
+
+def lattice_samples(center, step, count):
+    """
+    Picks the lattice points nearest to evenly spaced samples around a centre.
+
+    Parameters:
+    center (Fraction): Centre coordinate, in lattice units.
+    step (float): Distance between samples, in lattice units.
+    count (int): Number of samples.
+
+    Returns:
+    tuple: (first, offsets) - The lowest lattice point (int) and every sample's offset from it.
+    """
+    base = math.floor(center)
+    fraction = float(center - base)
+    offsets = np.rint(fraction + (np.arange(count) - (count - 1) / 2) * step).astype(np.int64)
+    low = int(offsets.min())
+    return base + low, offsets - low
+
+def render_view(center, span, width, height, max_iter, cache, level, reference=None):
+    """
+    Renders a view from the tiles of one lattice level, resampled to the output size.
+
+    Parameters:
+    center (tuple): (re, im) of the view centre, as Fractions.
+    span (float): Width of the view on the real axis.
+    width (int): The width of the image in pixels.
+    height (int): The height of the image in pixels.
+    max_iter (int): The maximum number of iterations.
+    cache (TileCache): Where tiles are looked up and stored.
+    level (int): Lattice level to sample, coarser levels render faster.
+    reference (tuple): (re, im, level) lattice point of the reference orbit.
+
+    Returns:
+    np.array: (height, width) array of iteration counts, with the first row at the top.
+    """
+    step = math.ldexp(span / width, level) # Output pixel size in lattice units
+    first_re, cols = lattice_samples(center[0] * 2 ** level, step, width)
+    first_im, rows = lattice_samples(center[1] * 2 ** level, step, height)
+    rows = rows[::-1] # Top of the image is the largest imaginary part
+
+    # Tiles covering the samples, assembled into one mosaic
+    tile_col, col_start = divmod(first_re, TILE_SIZE)
+    tile_row, row_start = divmod(first_im, TILE_SIZE)
+    cols = cols + col_start
+    rows = rows + row_start
+    tile_cols = int(cols.max()) // TILE_SIZE + 1
+    tile_rows = int(rows.max()) // TILE_SIZE + 1
+    mosaic = np.empty((tile_rows * TILE_SIZE, tile_cols * TILE_SIZE), dtype=np.int64)
+    for r in range(tile_rows):
+        for c in range(tile_cols):
+            key = (level, tile_col + c, tile_row + r, max_iter)
+            tile = cache.get(key)
+            if tile is None:
+                tile = render_tile(level, tile_col + c, tile_row + r, max_iter, reference)
+                cache.put(key, tile)
+            mosaic[r * TILE_SIZE:(r + 1) * TILE_SIZE, c * TILE_SIZE:(c + 1) * TILE_SIZE] = tile
+    return mosaic[np.ix_(rows, cols)]
+
+def frame_level(span, width):
+    """Returns the lattice level whose pixels are no wider than the output pixels."""
+    return max(0, math.ceil(-math.log2(span / width)))
+
+def render_frame(center, span, width, height, max_iter, cache, passes=4):
+    """
+    Renders a frame progressively, each pass at twice the resolution of the one before.
+
+    Parameters:
+    center (tuple): (re, im) of the frame centre, as Fractions (or anything Fraction accepts).
+    span (float): Width of the frame on the real axis.
+    width (int): The width of the image in pixels.
+    height (int): The height of the image in pixels.
+    max_iter (int): The maximum number of iterations.
+    cache (TileCache): Where tiles are looked up and stored.
+    passes (int): Number of passes, the first one at 2**(passes - 1) times coarser resolution.
+
+    Yields:
+    np.array: (height, width) array of iteration counts after each pass, the last one at full resolution.
+    """
+    center = (Fraction(center[0]), Fraction(center[1]))
+    level = frame_level(span, width)
+    reference = None
+    if level > PERTURBATION_LEVEL:
+        # One reference orbit for the whole frame, at the lattice point nearest its centre
+        reference = (round(center[0] * 2 ** level), round(center[1] * 2 ** level), level)
+    for coarse in range(passes - 1, -1, -1):
+        yield render_view(center, span, width, height, max_iter, cache, max(level - coarse, 0), reference)
+
+def zoom_sequence(center, span, zoom, frames, width, height, max_iter, cache=None, passes=4):
+    """
+    Renders a zoom into a fixed centre, frame by frame.
+
+    Parameters:
+    center (tuple): (re, im) of the zoom centre, as decimal strings or Fractions.
+    span (float): Width of the first frame on the real axis.
+    zoom (float): Factor the width shrinks by from one frame to the next.
+    frames (int): Number of frames.
+    width (int): The width of the images in pixels.
+    height (int): The height of the images in pixels.
+    max_iter (int): The maximum number of iterations.
+    cache (TileCache): Tile cache shared by the frames (default: a new one).
+    passes (int): Progressive passes per frame, see render_frame().
+
+    Yields:
+    tuple: (frame, image, final) - The frame number, the image after a pass, and whether
+    it is the last pass of that frame.
+    """
+    cache = cache or TileCache()
+    for frame in range(frames):
+        for number, image in enumerate(render_frame(center, span / zoom ** frame, width, height, max_iter, cache, passes)):
+            yield frame, image, number == passes - 1
+
+def main():
+    """
+    Main function to render a zoom sequence, either on screen or into PNG files.
+    """
+    parser = argparse.ArgumentParser(
+        description='Render a progressive, tile-cached zoom into the Mandelbrot set.'
+    )
+    parser.add_argument(
+        '--center',
+        nargs=2,
+        metavar=('RE', 'IM'),
+        default=['-0.743643887037158704752191506114774', '0.131825904205311970493132056385139'],
+        help='Centre of the zoom, as decimal numbers with as many digits as needed.'
+    )
+    parser.add_argument(
+        '--span',
+        type=float,
+        default=3.0,
+        help='Width of the first frame on the real axis (default: 3).'
+    )
+    parser.add_argument(
+        '--zoom',
+        type=float,
+        default=2.0,
+        help='Factor the width shrinks by per frame (default: 2).'
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=40,
+        help='Number of frames (default: 40).'
+    )
+    parser.add_argument(
+        '--size',
+        nargs=2,
+        type=int,
+        metavar=('WIDTH', 'HEIGHT'),
+        default=[400, 300],
+        help='Frame size in pixels (default: 400 300).'
+    )
+    parser.add_argument(
+        '--max-iter',
+        type=int,
+        default=1000,
+        help='Maximum number of iterations (default: 1000).'
+    )
+    parser.add_argument(
+        '--passes',
+        type=int,
+        default=4,
+        help='Progressive passes per frame, coarsest first (default: 4).'
+    )
+    parser.add_argument(
+        '--out',
+        help='Directory to save the frames to as PNG files, instead of showing them.'
+    )
+    args = parser.parse_args()
+
+    width, height = args.size
+    cache = TileCache()
+    sequence = zoom_sequence(args.center, args.span, args.zoom, args.frames, width, height,
+                             args.max_iter, cache, max(args.passes, 1))
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for frame, image, final in sequence:
+            if final:
+                path = os.path.join(args.out, 'frame_%04d.png' % frame)
+                plt.imsave(path, image, cmap='magma')
+                print(f"{path}  ({cache.hits} tile hits, {cache.misses} misses)")
+        return
+
+    figure = plt.figure()
+    picture = plt.imshow(np.zeros((height, width)), cmap='magma')
+    plt.axis('off')
+    for frame, image, final in sequence:
+        picture.set_data(image)
+        picture.set_clim(image.min(), image.max())
+        plt.title(f"Frame {frame + 1}, width {args.span / args.zoom ** frame:.3g}")
+        plt.pause(0.001)
+        if not plt.fignum_exists(figure.number):
+            break
+    else:
+        plt.show()
+
+if __name__ == "__main__":
+    main()
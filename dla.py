@@ -1,23 +1,35 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import random
+import math
 
-def initialize_grid(grid_size):
+# --- Fast DLA engine settings ---
+LAUNCH_MARGIN = 5 # Walkers start this far outside the cluster radius
+MAX_MAP_DISTANCE = 32 # Distances to the cluster are tracked exactly up to this value
+JUMP_THRESHOLD = 4 # Walkers at least this far from the cluster take a single large jump
+WALKER_SPACING = 8 # The batched engine keeps one walker in flight per this much launch circle
+
+def initialize_grid(grid_size, dtype=int):
     """
     Initializes the grid for DLA simulation with a seed particle at the center.
 
     Parameters:
     grid_size (int): Size of the square grid.
+    dtype (type): NumPy data type of the grid, uint8 keeps very large grids small.
 
     Returns:
     tuple: (grid, occupied_cells) - grid is a NumPy array, occupied_cells is a set of occupied coordinates.
     """
-    grid = np.zeros((grid_size, grid_size), dtype=int) # 0: empty, 1: occupied
+    grid = np.zeros((grid_size, grid_size), dtype=dtype) # 0: empty, 1: occupied
     center = grid_size // 2
     grid[center, center] = 1 # Seed particle at the center
     occupied_cells = {(center, center)}
     return grid, occupied_cells
 
+# --- Reference implementation: one walker at a time, one lattice step at a time ---
+# Far too slow for real runs, kept as the plain statement of the algorithm that the fast
+# and batched engines below speed up.
+
 def get_random_start_position(grid_size):
     """
     Gets a random starting position for a walker at the grid boundary.
@@ -40,7 +52,8 @@ def get_random_start_position(grid_size):
 
 def random_walk(grid, occupied_cells, grid_size):
     """
-    Simulates a random walk until the particle sticks to the cluster.
+    Simulates a random walk until the particle sticks to the cluster (reference
+    implementation, see run_fast_dla_simulation).
 
     Parameters:
     grid (np.array): The grid.
@@ -68,24 +81,14 @@ def random_walk(grid, occupied_cells, grid_size):
                         (neighbor_x, neighbor_y) in occupied_cells):
                     return x, y # Stick!
 
-def display_dla_fractal(grid):
-    """
-    Displays the DLA fractal grid using matplotlib.
-
-    Parameters:
-    grid (np.array): The DLA grid.
-    """
-    plt.figure(figsize=(8, 8))
-    plt.imshow(grid, cmap='viridis', interpolation='none') # 'viridis' for visualization
-    plt.title('Diffusion-Limited Aggregation (DLA) Fractal')
-    plt.axis('off') # Hide axes
-    plt.colorbar(label='Occupied (1) / Empty (0)') # Colorbar to indicate occupied/empty
-    plt.show()
-
 def run_dla_simulation(grid_size, num_particles):
     """
     Runs the DLA simulation and displays the resulting fractal.
 
+    This is the reference implementation: walkers start at the edge of the grid and
+    take single lattice steps, which is very slow. Use run_fast_dla_simulation or
+    run_batched_dla_simulation for real runs.
+
     Parameters:
     grid_size (int): Size of the grid.
     num_particles (int): Number of particles to aggregate.
@@ -99,8 +102,272 @@ def run_dla_simulation(grid_size, num_particles):
 
     display_dla_fractal(grid)
 
+# --- Fast engines ---
+
+def update_distance_map(distance_map, x, y):
+    """
+    Lowers the distance map around a newly stuck particle.
+
+    Parameters:
+    distance_map (np.array): Distance from every cell to the nearest cluster cell, capped at MAX_MAP_DISTANCE.
+    x (int): Column of the new particle.
+    y (int): Row of the new particle.
+    """
+    grid_size = distance_map.shape[0]
+    x0, x1 = max(x - MAX_MAP_DISTANCE, 0), min(x + MAX_MAP_DISTANCE + 1, grid_size)
+    y0, y1 = max(y - MAX_MAP_DISTANCE, 0), min(y + MAX_MAP_DISTANCE + 1, grid_size)
+    dx = np.arange(x0, x1) - x
+    dy = np.arange(y0, y1) - y
+    distance = np.hypot(dx[np.newaxis, :], dy[:, np.newaxis])
+    np.minimum(distance_map[y0:y1, x0:x1], distance, out=distance_map[y0:y1, x0:x1])
+
+def fast_random_walk(grid, distance_map, cluster_radius, kill_radius):
+    """
+    Simulates a random walk from the launch circle until the particle sticks to the cluster.
+
+    Walkers far away from the cluster jump in a random direction by (almost) their distance
+    to the cluster, which they cannot cross without touching it. Walkers that wander past
+    the kill circle are relaunched.
+
+    Parameters:
+    grid (np.array): The grid.
+    distance_map (np.array): Capped distance from every cell to the nearest cluster cell.
+    cluster_radius (float): Distance of the farthest cluster particle from the center.
+    kill_radius (float): Walkers farther than this from the center are relaunched.
+
+    Returns:
+    tuple: (x, y) - Coordinates where the particle stuck.
+    """
+    center = grid.shape[0] // 2
+    launch_radius = cluster_radius + LAUNCH_MARGIN
+    directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+    # Local names keep the inner loop fast
+    rand, cos, sin, hypot = random.random, math.cos, math.sin, math.hypot
+    tau = 2 * math.pi
+    x = y = None
+
+    while True:
+        if x is None:
+            # (Re)launch the walker at a random point on the launch circle
+            angle = rand() * tau
+            x = center + round(launch_radius * cos(angle))
+            y = center + round(launch_radius * sin(angle))
+
+        radius = hypot(x - center, y - center)
+        if radius > kill_radius:
+            x = None
+            continue
+
+        # Lower bound on the distance to the cluster
+        gap = radius - cluster_radius
+        if gap < MAX_MAP_DISTANCE:
+            mapped = distance_map[y, x]
+            if mapped > gap:
+                gap = mapped
+
+        if gap >= JUMP_THRESHOLD:
+            # Jump short of the cluster, landing at least two cells away from it
+            length = int(gap) - 2
+            angle = rand() * tau
+            x += round(length * cos(angle))
+            y += round(length * sin(angle))
+            continue
+
+        dx, dy = directions[int(rand() * 4)]
+        x, y = x + dx, y + dy
+        if grid[y, x + 1] or grid[y, x - 1] or grid[y + 1, x] or grid[y - 1, x]:
+            return x, y # Stick!
+
+def run_fast_dla_simulation(grid_size, num_particles, display=True):
+    """
+    Runs the DLA simulation with launch/kill circles and distance-map jumps.
+    The simulation stops early if the cluster grows too close to the edge of the grid.
+
+    Parameters:
+    grid_size (int): Size of the grid.
+    num_particles (int): Number of particles to aggregate.
+    display (bool): Show the resulting fractal.
+
+    Returns:
+    np.array: The DLA grid.
+    """
+    grid, _ = initialize_grid(grid_size, dtype=np.uint8)
+    center = grid_size // 2
+    distance_map = np.full((grid_size, grid_size), MAX_MAP_DISTANCE, dtype=np.float32)
+    update_distance_map(distance_map, center, center)
+
+    # Walkers must stay far enough inside the grid to look at their neighbours
+    max_radius = grid_size / 2 - 3
+    cluster_radius = 0.0
+
+    for i in range(num_particles):
+        launch_radius = cluster_radius + LAUNCH_MARGIN
+        if launch_radius > max_radius:
+            print(f"Cluster reached the edge of the grid after {i} particles.")
+            break
+        kill_radius = min(max(2 * launch_radius, launch_radius + 20), max_radius)
+
+        stick_x, stick_y = fast_random_walk(grid, distance_map, cluster_radius, kill_radius)
+        grid[stick_y, stick_x] = 1
+        update_distance_map(distance_map, stick_x, stick_y)
+        cluster_radius = max(cluster_radius, math.hypot(stick_x - center, stick_y - center))
+
+    if display:
+        display_dla_fractal(grid)
+    return grid
+
+def launch_walkers(rng, count, center, launch_radius):
+    """
+    Places walkers at random points on the launch circle.
+
+    Parameters:
+    rng (np.random.Generator): Random number generator.
+    count (int): Number of walkers to launch.
+    center (int): Row and column of the grid center.
+    launch_radius (float): Radius of the launch circle.
+
+    Returns:
+    tuple: (x, y) - Integer coordinate arrays of the new walkers.
+    """
+    angle = rng.random(count) * 2 * np.pi
+    x = center + np.rint(launch_radius * np.cos(angle)).astype(np.int64)
+    y = center + np.rint(launch_radius * np.sin(angle)).astype(np.int64)
+    return x, y
+
+def walker_count(launch_radius):
+    """
+    Number of walkers the batched engine keeps in flight around a cluster.
+
+    Walkers that arrive together do not screen each other, so too many of them fill in the
+    fjords of a small cluster. Tying the count to the launch circle keeps the number of
+    walkers arriving per unit of cluster perimeter roughly constant as the cluster grows.
+
+    Parameters:
+    launch_radius (float): Radius of the launch circle.
+
+    Returns:
+    int: Number of walkers.
+    """
+    return max(1, int(2 * np.pi * launch_radius / WALKER_SPACING))
+
+def run_batched_dla_simulation(grid_size, num_particles, num_walkers=None, seed=None, display=True):
+    """
+    Runs the DLA simulation with many walkers advancing at once as NumPy arrays.
+
+    Every step, walkers far from the cluster jump and the rest take one random lattice step.
+    Walkers next to the cluster stick. When several walkers stick on the same cell in the
+    same step, the walker with the lowest index wins and the others are relaunched, so a
+    given seed always produces the same cluster.
+
+    By default the number of walkers in flight grows with the launch circle (see
+    walker_count), which keeps the cluster as branched as run_fast_dla_simulation grows it.
+    A large fixed num_walkers is faster but fills the core of the cluster in almost solid:
+    walkers arriving together do not screen each other from the inner branches.
+
+    Parameters:
+    grid_size (int): Size of the grid.
+    num_particles (int): Number of particles to aggregate.
+    num_walkers (int): Fixed number of walkers in flight, or None to follow walker_count.
+    seed (int): Seed for the random number generator.
+    display (bool): Show the resulting fractal.
+
+    Returns:
+    np.array: The DLA grid.
+    """
+    rng = np.random.default_rng(seed)
+    grid, _ = initialize_grid(grid_size, dtype=np.uint8)
+    center = grid_size // 2
+    distance_map = np.full((grid_size, grid_size), MAX_MAP_DISTANCE, dtype=np.float32)
+    update_distance_map(distance_map, center, center)
+
+    directions = np.array([(0, 1), (0, -1), (1, 0), (-1, 0)])
+    max_radius = grid_size / 2 - 3
+    cluster_radius = 0.0
+    launch_radius = cluster_radius + LAUNCH_MARGIN
+    kill_radius = min(max(2 * launch_radius, launch_radius + 20), max_radius)
+    x, y = launch_walkers(rng, num_walkers or walker_count(launch_radius), center, launch_radius)
+    stuck_count = 0
+
+    while stuck_count < num_particles:
+        # Vectorized neighbour lookup on the grid
+        touching = grid[y, x + 1] | grid[y, x - 1] | grid[y + 1, x] | grid[y - 1, x]
+        stuck = np.flatnonzero(touching)
+        if stuck.size:
+            # Settle conflicts: the lowest walker index wins each cell
+            cells = y[stuck] * grid_size + x[stuck]
+            _, first = np.unique(cells, return_index=True)
+            winners = np.sort(stuck[first])[:num_particles - stuck_count]
+            grid[y[winners], x[winners]] = 1
+            for wx, wy in zip(x[winners].tolist(), y[winners].tolist()):
+                update_distance_map(distance_map, wx, wy)
+            stuck_count += winners.size
+            cluster_radius = max(cluster_radius, np.hypot(x[winners] - center, y[winners] - center).max())
+
+            launch_radius = cluster_radius + LAUNCH_MARGIN
+            if launch_radius > max_radius:
+                print(f"Cluster reached the edge of the grid after {stuck_count} particles.")
+                break
+            kill_radius = min(max(2 * launch_radius, launch_radius + 20), max_radius)
+
+            # Stuck walkers and walkers that lost a conflict start again
+            x[stuck], y[stuck] = launch_walkers(rng, stuck.size, center, launch_radius)
+            if num_walkers is None and walker_count(launch_radius) > x.size:
+                extra_x, extra_y = launch_walkers(rng, walker_count(launch_radius) - x.size, center, launch_radius)
+                x, y = np.concatenate([x, extra_x]), np.concatenate([y, extra_y])
+
+            # Walkers next to a particle that just stuck stay put and stick on the next step
+            touching = grid[y, x + 1] | grid[y, x - 1] | grid[y + 1, x] | grid[y - 1, x]
+
+        # Lower bound on every walker's distance to the cluster
+        radius = np.hypot(x - center, y - center)
+        gap = radius - cluster_radius
+        near = gap < MAX_MAP_DISTANCE
+        gap[near] = np.maximum(gap[near], distance_map[y[near], x[near]])
+
+        # Far walkers jump short of the cluster, the rest take one lattice step
+        moving = touching == 0
+        jumping = moving & (gap >= JUMP_THRESHOLD)
+        length = np.floor(gap[jumping]) - 2
+        angle = rng.random(length.size) * 2 * np.pi
+        x[jumping] += np.rint(length * np.cos(angle)).astype(np.int64)
+        y[jumping] += np.rint(length * np.sin(angle)).astype(np.int64)
+        step = directions[rng.integers(0, 4, size=x.size)]
+        stepping = moving & ~jumping
+        x[stepping] += step[stepping, 0]
+        y[stepping] += step[stepping, 1]
+
+        # Relaunch walkers that wandered past the kill circle
+        lost = np.hypot(x - center, y - center) > kill_radius
+        if lost.any():
+            x[lost], y[lost] = launch_walkers(rng, np.count_nonzero(lost), center, launch_radius)
+
+    if display:
+        display_dla_fractal(grid)
+    return grid
+
+def display_dla_fractal(grid):
+    """
+    Displays the DLA fractal grid using matplotlib.
+
+    Parameters:
+    grid (np.array): The DLA grid.
+    """
+    plt.figure(figsize=(8, 8))
+    plt.imshow(grid, cmap='viridis', interpolation='none') # 'viridis' for visualization
+    plt.title('Diffusion-Limited Aggregation (DLA) Fractal')
+    plt.axis('off') # Hide axes
+    plt.colorbar(label='Occupied (1) / Empty (0)') # Colorbar to indicate occupied/empty
+    plt.show()
+
 
 if __name__ == '__main__':
     grid_size = 2*100  # Adjust grid size for resolution
     num_particles = 2*5000 # Adjust number of particles for fractal size/density
-    run_dla_simulation(grid_size, num_particles)
\ No newline at end of file
+    engine = 'fast' # 'fast' (one walker at a time), 'batched' (NumPy walkers) or 'reference' (slow)
+
+    if engine == 'fast':
+        run_fast_dla_simulation(grid_size, num_particles)
+    elif engine == 'batched':
+        run_batched_dla_simulation(grid_size, num_particles)
+    else:
+        run_dla_simulation(grid_size, num_particles)
@@ -3,19 +3,95 @@
 # Description:
 #   A command-line tool to generate G-Code from a Python turtle graphics script.
 #   This tool imports a user-provided Python script, executes a designated drawing function,
-#   and outputs the G-Code to standard out, formatted with a custom template.
+#   and outputs the G-Code to standard out (or a file), formatted with a custom template.
+#   Generated G-Code is cached on disk, so running the same script with the same settings
+#   again just copies the earlier result (see gcode_cache.py, disable with --no-cache).
 #
 # Usage:
-#   python gcodegen.py <filename.py>
+#   python gcodegen.py <filename.py> [--output <filename.gcode>]
 #
 # Dependencies:
-#   - turtle-gcode (pip install turtle-gcode)
+#   - turtle-gcode (pip install turtle-gcode), only needed for --backend turtle-gcode
+#   - scipy (pip install scipy), only needed for --optimize-travel
 
 import argparse
+import contextlib
 import importlib.util
+import json
 import sys
 import io
-import turtle_gcode as t
+from gcode_cache import (DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, cache_key, commit_entry, copy_entry,
+                         discard_entry, lookup, open_entry, read_entry)
+from gcode_writer import compute_scale, write_gcode, write_template
+from recording_turtle import RecordingTurtle
+from simplify import simplify_drawing, thin_by_density
+
+# Pen commands sent around every travel move
+PENUP_COMMAND = "G04 P0.5\n\rM03\n\rG04 P0.5"
+PENDOWN_COMMAND = "G04 P0.5\n\rM05\n\rG04 P1"
+
+def parse_override(text):
+    """
+    Parses a NAME=VALUE module override. The value is read as JSON when possible
+    (numbers, booleans, lists...) and kept as a string otherwise.
+    """
+    name, separator, value = text.partition('=')
+    if not separator or not name.isidentifier():
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got '{text}'")
+    try:
+        return name, json.loads(value)
+    except json.JSONDecodeError:
+        return name, value
+
+def write_output(path, write):
+    """
+    Opens the output (a file, or standard out if path is None) and writes to it.
+
+    Args:
+        path (str): The output file, or None for standard out.
+        write (callable): Function that writes to the text stream it is given.
+    """
+    output = open(path, 'w') if path else sys.stdout
+    try:
+        write(output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+class TeeStream:
+    """
+    Text stream that passes everything through to another stream and also appends it,
+    with the stream's name, to a transcript.
+    """
+    def __init__(self, stream, name, transcript):
+        self.stream = stream
+        self.name = name
+        self.transcript = transcript
+
+    def write(self, text):
+        self.transcript.append((self.name, text))
+        return self.stream.write(text)
+
+    def __getattr__(self, attr):
+        return getattr(self.stream, attr)
+
+@contextlib.contextmanager
+def record_output(transcript):
+    """
+    Records what is printed to standard out and standard error, while still printing it.
+
+    Args:
+        transcript (list): List the (stream name, text) pairs are appended to.
+    """
+    with contextlib.redirect_stdout(TeeStream(sys.stdout, 'stdout', transcript)), \
+            contextlib.redirect_stderr(TeeStream(sys.stderr, 'stderr', transcript)):
+        yield
+
+def replay_output(transcript):
+    """Prints a transcript recorded by record_output again."""
+    streams = {'stdout': sys.stdout, 'stderr': sys.stderr}
+    for name, text in transcript:
+        streams[name].write(text)
 
 def main():
     """
@@ -46,77 +122,218 @@ def main():
         default=300,
         help='The height of the printable area.'
     )
+    parser.add_argument(
+        '--backend',
+        choices=['recording', 'turtle-gcode'],
+        default='recording',
+        help='The turtle used to run the drawing: the headless recording turtle, '
+             'or turtle-gcode, which needs a display (default: recording).'
+    )
+    parser.add_argument(
+        '--set',
+        type=parse_override,
+        action='append',
+        default=[],
+        metavar='NAME=VALUE',
+        help='Override a module-level setting of the script before drawing, '
+             'e.g. --set LEVEL=7 (can be repeated).'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help='Write the G-Code to this file instead of standard out.'
+    )
+    parser.add_argument(
+        '--optimize-travel',
+        action='store_true',
+        help='Reorder and reverse strokes to minimize pen-up travel (recording backend only).'
+    )
+    parser.add_argument(
+        '--arcs',
+        type=float,
+        metavar='TOLERANCE',
+        help='Send runs of points that lie on a circle as G2/G3 arcs, keeping them within '
+             'this many mm of the original (recording backend only).'
+    )
+    parser.add_argument(
+        '--thin',
+        type=float,
+        metavar='PEN_WIDTH',
+        help='Drop moves that only go over ink already laid down by a pen this many mm '
+             'wide, lifting the pen over long redrawn stretches (recording backend only).'
+    )
+    parser.add_argument(
+        '--simplify',
+        type=float,
+        metavar='TOLERANCE',
+        help='Merge strokes and drop redundant points, keeping the drawing within this '
+             'many mm of the original (recording backend only).'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always run the drawing, without reading or writing the G-Code cache. '
+             'Use it for scripts that draw something different on every run.'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_CACHE_DIR,
+        help=f'Where to keep cached G-Code (default: {DEFAULT_CACHE_DIR}).'
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_MAX_BYTES >> 20,
+        metavar='MB',
+        help='Size limit of the cache, least recently used files are removed first '
+             f'(default: {DEFAULT_MAX_BYTES >> 20}).'
+    )
 
     args = parser.parse_args()
+    if args.optimize_travel and args.backend != 'recording':
+        parser.error('--optimize-travel needs the recording backend.')
+    if args.arcs is not None and args.backend != 'recording':
+        parser.error('--arcs needs the recording backend.')
+    if args.arcs is not None and args.arcs <= 0:
+        parser.error('--arcs needs a tolerance greater than zero.')
+    if args.thin is not None and args.backend != 'recording':
+        parser.error('--thin needs the recording backend.')
+    if args.thin is not None and args.thin <= 0:
+        parser.error('--thin needs a pen width greater than zero.')
+    if args.simplify is not None and args.backend != 'recording':
+        parser.error('--simplify needs the recording backend.')
+    if args.simplify is not None and args.simplify < 0:
+        parser.error('--simplify needs a tolerance of zero or more.')
 
     try:
-        # Dynamically import the user-provided Python script
-        spec = importlib.util.spec_from_file_location("user_module", args.filename)
-        if spec is None:
-            print(f"Error: Cannot find module specification for '{args.filename}'.", file=sys.stderr)
-            sys.exit(1)
-        user_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(user_module)
-
-        # Get the drawing function from the imported module
-        if hasattr(user_module, args.draw_function) and callable(getattr(user_module, args.draw_function)):
-            draw_func = getattr(user_module, args.draw_function)
-        else:
-            print(f"Error: The file '{args.filename}' does not have a function named '{args.draw_function}'.", file=sys.stderr)
-            sys.exit(1)
+        # Reuse the G-Code from an earlier run with the same script, settings and code
+        key = None
+        if not args.no_cache:
+            options = {
+                'width': args.width,
+                'height': args.height,
+                'backend': args.backend,
+                'set': args.set,
+                'optimize_travel': args.optimize_travel,
+                'arcs': args.arcs,
+                'simplify': args.simplify,
+                'thin': args.thin,
+            }
+            key = cache_key(args.filename, args.draw_function, options)
+            cached = lookup(args.cache_dir, key)
+            # An entry evicted by another run since the lookup is a miss
+            entry = read_entry(cached) if cached is not None else None
+            if entry is not None:
+                transcript, gcode = entry
+                with gcode:
+                    # Show the messages of the run that wrote the entry, then its G-Code
+                    replay_output(transcript)
+                    write_output(args.output, lambda output: copy_entry(gcode, output))
+                return
 
-        # Create a turtle instance from the turtle-gcode library
-        t.setup(800,800,0,0)
-        t.speed(0)
-        t.tracer(0,0)
+        # Record what the script and the steps below print, to replay it on a cache hit
+        transcript = []
+        with record_output(transcript) if key is not None else contextlib.nullcontext():
+            # Dynamically import the user-provided Python script
+            spec = importlib.util.spec_from_file_location("user_module", args.filename)
+            if spec is None:
+                print(f"Error: Cannot find module specification for '{args.filename}'.", file=sys.stderr)
+                sys.exit(1)
+            user_module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(user_module)
+            for name, value in args.set:
+                if not hasattr(user_module, name):
+                    print(f"Error: The file '{args.filename}' has no setting named '{name}'.", file=sys.stderr)
+                    sys.exit(1)
+                setattr(user_module, name, value)
 
+            # Get the drawing function from the imported module
+            if hasattr(user_module, args.draw_function) and callable(getattr(user_module, args.draw_function)):
+                draw_func = getattr(user_module, args.draw_function)
+            else:
+                print(f"Error: The file '{args.filename}' does not have a function named '{args.draw_function}'.", file=sys.stderr)
+                sys.exit(1)
 
-        # Execute the user's drawing function
-        draw_func(t)
-        t.update()
+            if args.backend == 'recording':
+                # Record the drawing headlessly, no Tk window is ever created
+                t = RecordingTurtle()
+                t.getscreen().setup(800, 800)
+            else:
+                # Create a turtle instance from the turtle-gcode library
+                import turtle_gcode as t
+                t.setup(800,800,0,0)
+                t.speed(0)
+                t.tracer(0,0)
+
+            # Execute the user's drawing function
+            draw_func(t)
+            t.update()
+
+            strokes = t.strokes if args.backend == 'recording' else None
+            # Recorded circles stay true arcs unless a step below rebuilds the strokes
+            arcs = t.arcs if args.backend == 'recording' else None
+            if args.thin is not None and strokes:
+                # The pen width is given in mm, thin in turtle units
+                info = compute_scale(strokes, args.width, args.height, allow_rotation=True)
+                strokes, report = thin_by_density(strokes, args.thin / info.scale)
+                print(f"Thinned: kept {report['points_after']} of {report['points_before']} points "
+                      f"({report['points_before'] - report['points_after']} dropped), "
+                      f"{report['strokes_before']} -> {report['strokes_after']} strokes", file=sys.stderr)
+            if args.simplify is not None and strokes:
+                # The tolerance is given in mm, simplify in turtle units
+                info = compute_scale(strokes, args.width, args.height, allow_rotation=True)
+                strokes, report = simplify_drawing(strokes, args.simplify / info.scale)
+                print(f"Simplified: {report['points_before']} -> {report['points_after']} points, "
+                      f"{report['strokes_before']} -> {report['strokes_after']} strokes", file=sys.stderr)
+            if args.optimize_travel:
+                # Imported here so runs that do not need scipy skip loading it
+                from path_optimizer import estimate_time_saved, optimize_path
+                strokes, report = optimize_path(strokes)
+                if report is not None:
+                    info = compute_scale(strokes, args.width, args.height, allow_rotation=True)
+                    distance, seconds = estimate_time_saved(report, info.scale)
+                    print(f"Pen-up travel: {report['travel_before'] * info.scale:.1f} mm -> "
+                          f"{report['travel_after'] * info.scale:.1f} mm, pen lifts: "
+                          f"{report['lifts_before']} -> {report['lifts_after']} "
+                          f"(saves {distance:.1f} mm, about {seconds:.0f} s)", file=sys.stderr)
 
         # Generate the G-Code
-        gcode_output = t.write_gcode(args.width, args.height, penup_command = "G04 P0.5\n\rM03\n\rG04 P0.5", pendown_command = "G04 P0.5\n\rM05\n\rG04 P1", allow_rotation = True)
-
-        # Split the generated G-Code
-        gcode_lines = gcode_output.strip().split('\n')
-
-        first_line = ""
-        rest_of_lines = []
-
-        if gcode_lines:
-            first_line = gcode_lines[0]
-            rest_of_lines = gcode_lines[1:]
-
-        # Format the G-Code using the user-provided template
-        template = f""";### Header ###
-
-G21
-G90
-F2000
-M03
-G0 X0 Y0
-G04 P1
-
-;### First line of the gcode ###
-{first_line}
-
-;### Stuff to be inserted after the first G0 ###
-M05
-G04 P1
-
-;### Rest of the gcode ###
-"""
-        template += "\n".join(rest_of_lines)
-        template += """
-;### Footer ###
-
-M03
-G04 P1
-G0 X0 Y0
-"""
-        # Print the final formatted G-Code
-        print(template)
+        def write_drawing(output):
+            if args.backend == 'recording':
+                # Stream the recorded polylines straight to the output
+                write_gcode(output, strokes, args.width, args.height, penup_command=PENUP_COMMAND,
+                            pendown_command=PENDOWN_COMMAND, allow_rotation=True, arc_tolerance=args.arcs,
+                            arcs=arcs if strokes is t.strokes else None)
+            else:
+                gcode_output = t.write_gcode(args.width, args.height, penup_command=PENUP_COMMAND,
+                                             pendown_command=PENDOWN_COMMAND, allow_rotation=True)
+
+                # Split the generated G-Code
+                gcode_lines = gcode_output.strip().split('\n')
+                first_line = gcode_lines[0]
+                rest_of_lines = (line + "\n" for line in gcode_lines[1:])
+
+                # Format the G-Code using the plotter template
+                write_template(output, first_line, rest_of_lines)
+
+        if key is None:
+            write_output(args.output, write_drawing)
+        else:
+            # Write the cache entry first, then copy it to the output
+            entry = open_entry(args.cache_dir, transcript)
+            try:
+                with entry:
+                    write_drawing(entry)
+            except BaseException:
+                discard_entry(entry.name)
+                raise
+            cached = commit_entry(args.cache_dir, key, entry.name, args.cache_size << 20)
+            entry = read_entry(cached)
+            if entry is None:
+                # Another run evicted the new entry already, write the drawing again
+                write_output(args.output, write_drawing)
+            else:
+                with entry[1] as gcode:
+                    write_output(args.output, lambda output: copy_entry(gcode, output))
 
     except FileNotFoundError:
         print(f"Error: The file '{args.filename}' was not found.", file=sys.stderr)
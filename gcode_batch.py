@@ -0,0 +1,204 @@
+# gcode_batch.py
+#
+# Description:
+#   Generates G-Code for many drawings in one go. A manifest lists the jobs: which script
+#   and drawing function to run, which module settings to override, and where to write
+#   the output. Every job runs gcode.py in its own Python process, several at a time, so a
+#   job that crashes or hangs only fails itself. A summary of timings and file sizes is
+#   printed (and optionally saved as JSON) at the end.
+#
+# Usage:
+#   python gcode_batch.py <manifest.toml|manifest.json> [--jobs N] [--summary summary.json]
+#
+# Manifest (TOML shown, JSON uses the same structure):
+#   [defaults]
+#   width = 410
+#   height = 300
+#
+#   [[jobs]]
+#   script = "hilbert.py"
+#   output = "out/hilbert7.gcode"
+#   set = { LEVEL = 7 }
+#
+#   [[jobs]]
+#   script = "attractor.py"
+#   output = "out/attractor.gcode"
+#   set = { NUM_STEPS = 30000 }
+#   simplify = 0.05
+#   optimize_travel = true
+#
+#   Paths are relative to the manifest. Job keys: script, output, function, width, height,
+#   set, thin, simplify, arcs, optimize_travel, backend, no_cache, timeout.
+#
+# Dependencies:
+#   - tomli (pip install tomli), only for TOML manifests on Python older than 3.11
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+GCODE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gcode.py')
+
+# Seconds a job may run before it is stopped, unless the manifest says otherwise
+DEFAULT_TIMEOUT = 3600
+
+def load_manifest(path):
+    """
+    Reads a JSON or TOML manifest.
+
+    Args:
+        path (str): Path to the manifest, TOML if it ends with .toml.
+
+    Returns:
+        tuple: (defaults, jobs) - The default job settings and the list of jobs.
+    """
+    if path.endswith('.toml'):
+        if tomllib is None:
+            import tomli as toml_parser
+        else:
+            toml_parser = tomllib
+        with open(path, 'rb') as f:
+            manifest = toml_parser.load(f)
+    else:
+        with open(path) as f:
+            manifest = json.load(f)
+
+    jobs = manifest.get('jobs', [])
+    for number, job in enumerate(jobs, 1):
+        for key in ('script', 'output'):
+            if key not in job:
+                raise ValueError(f"Job {number} in '{path}' has no '{key}'.")
+    return manifest.get('defaults', {}), jobs
+
+def build_command(job, base_dir):
+    """
+    Builds the gcode.py command line for a job.
+
+    Args:
+        job (dict): The job settings, defaults already applied.
+        base_dir (str): Directory that relative paths in the job are resolved against.
+
+    Returns:
+        list: The command, ready for subprocess.
+    """
+    command = [
+        sys.executable, GCODE_SCRIPT,
+        os.path.join(base_dir, job['script']),
+        '--draw-function', job.get('function', 'draw'),
+        '--output', os.path.join(base_dir, job['output']),
+    ]
+    for key in ('width', 'height', 'backend', 'thin', 'simplify', 'arcs'):
+        if job.get(key) is not None:
+            command += ['--' + key, str(job[key])]
+    if job.get('optimize_travel'):
+        command.append('--optimize-travel')
+    if job.get('no_cache'):
+        command.append('--no-cache')
+    for name, value in job.get('set', {}).items():
+        command += ['--set', f'{name}={json.dumps(value)}']
+    return command
+
+def run_job(job, base_dir):
+    """
+    Runs one job in its own process.
+
+    Args:
+        job (dict): The job settings, defaults already applied.
+        base_dir (str): Directory that relative paths in the job are resolved against.
+
+    Returns:
+        dict: The job's script, output, status ('ok', 'failed' or 'timeout'), run time in
+        seconds, output size in bytes and, for failed jobs, the end of its error output.
+    """
+    output = os.path.join(base_dir, job['output'])
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    result = {'script': job['script'], 'output': job['output'], 'set': job.get('set', {})}
+
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(build_command(job, base_dir), capture_output=True, text=True,
+                                 timeout=job.get('timeout', DEFAULT_TIMEOUT))
+        status = 'ok' if process.returncode == 0 else 'failed'
+        errors = process.stderr
+    except subprocess.TimeoutExpired:
+        status = 'timeout'
+        errors = f"Stopped after {job.get('timeout', DEFAULT_TIMEOUT)} seconds."
+    result['seconds'] = time.perf_counter() - start
+    result['status'] = status
+    result['bytes'] = os.path.getsize(output) if status == 'ok' and os.path.exists(output) else None
+    if status != 'ok':
+        result['error'] = errors.strip().splitlines()[-1] if errors.strip() else ''
+    return result
+
+def print_summary(results, elapsed):
+    """
+    Prints a table of the job results.
+
+    Args:
+        results (list): Results returned by run_job, in manifest order.
+        elapsed (float): Wall-clock time of the whole batch, in seconds.
+    """
+    for result in results:
+        size = f"{result['bytes']:>12,}" if result['bytes'] is not None else ' ' * 12
+        print(f"{result['status']:<8}{result['seconds']:>8.2f}s {size}  {result['output']}")
+        if result['status'] != 'ok':
+            print(f"        {result['error']}")
+    failed = sum(result['status'] != 'ok' for result in results)
+    total = sum(result['bytes'] or 0 for result in results)
+    print(f"{len(results) - failed} of {len(results)} jobs succeeded, {total:,} bytes written in {elapsed:.2f}s")
+
+def main():
+    """
+    Main function to read the manifest, run the jobs in parallel and report the results.
+    """
+    parser = argparse.ArgumentParser(
+        description='Generate G-Code for every job in a manifest, in parallel.'
+    )
+    parser.add_argument(
+        'manifest',
+        help='JSON or TOML file listing the jobs.'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=os.cpu_count(),
+        help='Number of jobs to run at the same time (default: number of CPUs).'
+    )
+    parser.add_argument(
+        '--summary',
+        help='Also write the results as JSON to this file.'
+    )
+    args = parser.parse_args()
+
+    try:
+        defaults, jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot read manifest '{args.manifest}': {e}", file=sys.stderr)
+        sys.exit(1)
+    base_dir = os.path.dirname(os.path.abspath(args.manifest))
+    jobs = [{**defaults, **job} for job in jobs]
+
+    # Each job is a separate process, the threads only wait for them
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        results = list(pool.map(lambda job: run_job(job, base_dir), jobs))
+    elapsed = time.perf_counter() - start
+
+    print_summary(results, elapsed)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump({'seconds': elapsed, 'jobs': results}, f, indent=2)
+    if any(result['status'] != 'ok' for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
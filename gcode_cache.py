@@ -0,0 +1,248 @@
+# gcode_cache.py
+#
+# Description:
+#   An on-disk cache for generated G-Code. Entries are addressed by a SHA-256 hash of
+#   everything that can change the output: the drawing script and the local modules it
+#   imports, the drawing function, the command-line options, and the versions of the code
+#   that turns drawings into G-Code. Entries are written atomically and the least recently
+#   used ones are removed once the cache grows past its size limit.
+#
+#   An entry is one line of JSON holding what the run printed (the drawing script's own
+#   output and the pipeline reports), followed by the G-Code, so a cache hit can show the
+#   same messages as the run that wrote it.
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from importlib import metadata
+
+# Default location, following the XDG base directory convention
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'python-math-drawlings', 'gcode'
+)
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Modules of this repository that take part in generating the G-Code (or its reports)
+PIPELINE_MODULES = ['gcode', 'gcode_writer', 'recording_turtle', 'simplify', 'path_optimizer', 'arc_fit', 'gcode_stats']
+
+# Bump to invalidate every existing entry when the key or entry format changes
+CACHE_FORMAT = 2
+
+# Bytes copied per read when streaming an entry
+COPY_BUFFER = 1 << 20
+
+def local_imports(path):
+    """
+    Finds the modules next to a script that it imports, directly or through each other.
+
+    Args:
+        path (str): Path to the Python script.
+
+    Returns:
+        list: Sorted paths of the local modules, not including the script itself.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    found = set()
+    pending = [os.path.abspath(path)]
+    while pending:
+        with open(pending.pop(), 'rb') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = os.path.join(directory, name.split('.')[0] + '.py')
+                if os.path.isfile(module) and module not in found:
+                    found.add(module)
+                    pending.append(module)
+    found.discard(os.path.abspath(path))
+    return sorted(found)
+
+def package_version(name):
+    """Returns the installed version of a package, or None if it is not installed."""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+def cache_key(script, function, options):
+    """
+    Computes the cache key for a G-Code job.
+
+    Args:
+        script (str): Path to the drawing script.
+        function (str): Name of the drawing function.
+        options (dict): Every other option that affects the output (JSON serializable).
+
+    Returns:
+        str: The hex SHA-256 digest.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    sources = [os.path.abspath(script)] + local_imports(script) \
+        + [os.path.join(here, name + '.py') for name in PIPELINE_MODULES]
+
+    digest = hashlib.sha256()
+    header = {
+        'format': CACHE_FORMAT,
+        'function': function,
+        'options': options,
+        'python': sys.version_info[:2],
+        'numpy': package_version('numpy'),
+        'scipy': package_version('scipy'),
+        'turtle-gcode': package_version('turtle-gcode'),
+    }
+    digest.update(json.dumps(header, sort_keys=True).encode())
+    for source in dict.fromkeys(sources):
+        with open(source, 'rb') as f:
+            content = f.read()
+        # Length prefix, so the boundary between two files cannot shift
+        digest.update(b'%d\0' % len(content))
+        digest.update(content)
+    return digest.hexdigest()
+
+def entry_path(cache_dir, key):
+    """Returns the path of a cache entry."""
+    return os.path.join(cache_dir, key + '.gcode')
+
+def lookup(cache_dir, key):
+    """
+    Looks up a cache entry and marks it as recently used.
+
+    Args:
+        cache_dir (str): The cache directory.
+        key (str): The cache key.
+
+    Returns:
+        str: Path to the cached G-Code, or None on a miss.
+    """
+    path = entry_path(cache_dir, key)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+def open_entry(cache_dir, transcript=()):
+    """
+    Opens a temporary file in the cache directory to write a new entry into.
+
+    Args:
+        cache_dir (str): The cache directory, created if needed.
+        transcript (list): (stream name, text) pairs the run printed, replayed on a hit.
+
+    Returns:
+        file: Text stream to write the G-Code to, pass its name to commit_entry once it is
+        complete and closed.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    # No newline translation: the pen commands contain bare carriage returns
+    entry = tempfile.NamedTemporaryFile('w', dir=cache_dir, suffix='.tmp', delete=False, newline='')
+    entry.write(json.dumps([list(item) for item in transcript]) + '\n')
+    return entry
+
+def commit_entry(cache_dir, key, temp_path, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Publishes a completed entry under its key, then trims the cache to its size limit.
+    The rename is atomic, so readers never see a partly written entry. If the rename fails
+    (on Windows, another run may be reading an entry with the same key), the new entry is
+    dropped and the one already there is kept.
+
+    Args:
+        cache_dir (str): The cache directory.
+        key (str): The cache key.
+        temp_path (str): The file written through open_entry.
+        max_bytes (int): Size limit of the cache.
+
+    Returns:
+        str: Path to the entry.
+    """
+    path = entry_path(cache_dir, key)
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        discard_entry(temp_path)
+    evict(cache_dir, max_bytes, keep=path)
+    return path
+
+def discard_entry(temp_path):
+    """Removes a temporary entry that could not be completed or published, if it can."""
+    try:
+        os.remove(temp_path)
+    except OSError:
+        pass
+
+def evict(cache_dir, max_bytes, keep=None):
+    """
+    Removes the least recently used entries until the cache fits its size limit.
+    This is best effort: entries that cannot be removed (on Windows, entries another run
+    is reading) are skipped.
+
+    Args:
+        cache_dir (str): The cache directory.
+        max_bytes (int): Size limit of the cache.
+        keep (str): Path of an entry that must not be removed.
+    """
+    entries = []
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            if entry.name.endswith('.gcode') and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass # Already removed by another run
+        except OSError:
+            continue # Still in use, it keeps taking up space
+        total -= size
+
+def read_entry(path):
+    """
+    Opens a cache entry. Once open, the entry stays readable even if it is evicted.
+
+    Args:
+        path (str): Path to the entry.
+
+    Returns:
+        tuple: (transcript, file) - The (stream name, text) pairs the run printed, and the
+        entry positioned at the start of the G-Code. None if the entry is gone, which can
+        happen when another run evicts it after lookup.
+    """
+    try:
+        entry = open(path, newline='')
+    except FileNotFoundError:
+        return None
+    try:
+        transcript = json.loads(entry.readline())
+    except BaseException:
+        entry.close()
+        raise
+    return transcript, entry
+
+def copy_entry(entry, stream):
+    """
+    Streams the G-Code of a cache entry to an open text stream.
+
+    Args:
+        entry (file): The entry, as returned by read_entry.
+        stream (file): Text stream to write to.
+    """
+    shutil.copyfileobj(entry, stream, COPY_BUFFER)
@@ -0,0 +1,382 @@
+# gcode_stats.py
+#
+# Description:
+#   Estimates how long a plotter will take to draw a G-Code file, and where the time goes.
+#   The file is streamed line by line, so even very large jobs are analysed in constant
+#   memory. UTF-8 and UTF-16 files (with a byte order mark) are both accepted.
+#
+#   The time estimate uses a simple motion model: every move follows a trapezoidal speed
+#   profile (accelerate, cruise, decelerate) with a fixed acceleration. Speed is carried
+#   through corners up to a junction speed worked out from the corner angle (the junction
+#   deviation model used by GRBL), planning over a bounded window of upcoming moves like
+#   a controller's planner buffer. Dwell and pen commands stop the machine, and dwells
+#   (G04) add their time as is.
+#
+# Usage:
+#   python gcode_stats.py <file.gcode> [--accel 500] [--rapid-rate 3000] [--json]
+
+import argparse
+import codecs
+import io
+import json
+import math
+import re
+import sys
+
+# --- Default machine model ---
+DEFAULT_FEED_RATE = 2000 # mm/min, used until the file sets one with F
+DEFAULT_RAPID_RATE = 3000 # mm/min for G0 moves
+DEFAULT_ACCELERATION = 500 # mm/s^2
+DEFAULT_JUNCTION_DEVIATION = 0.01 # mm
+DEFAULT_LOOKAHEAD = 16 # moves
+
+# The pen commands of this repository's plotter: M03 lifts the pen, M05 lowers it
+PEN_UP = 3
+PEN_DOWN = 5
+
+# G commands that take X/Y words for something other than a move in the current motion mode
+AXIS_WORD_COMMANDS = (4, 10, 28, 30, 53, 92)
+
+WORD = re.compile(r'([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))')
+# A line of G-Code is made of words only, anything else (e.g. stray print output) is skipped
+BLOCK = re.compile(r'(?:\s*[A-Z]\s*[-+]?(?:\d+\.?\d*|\.\d+))+\s*')
+
+def open_text(path):
+    """
+    Opens a G-Code file as text, detecting UTF-16 and UTF-8 byte order marks.
+
+    Args:
+        path (str): The file to open.
+
+    Returns:
+        io.TextIOWrapper: A text stream over the file.
+    """
+    raw = open(path, 'rb')
+    start = raw.peek(4)[:4] if hasattr(raw, 'peek') else b''
+    if start.startswith(codecs.BOM_UTF32_LE) or start.startswith(codecs.BOM_UTF32_BE):
+        encoding = 'utf-32'
+    elif start.startswith(codecs.BOM_UTF16_LE) or start.startswith(codecs.BOM_UTF16_BE):
+        encoding = 'utf-16'
+    elif start.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+    else:
+        encoding = 'utf-8'
+    return io.TextIOWrapper(raw, encoding=encoding, errors='replace')
+
+def move_time(length, entry, exit, cruise, acceleration):
+    """
+    Returns the time of a move with a trapezoidal (or triangular) speed profile.
+
+    Args:
+        length (float): Length of the move in mm.
+        entry (float): Speed at the start, in mm/s.
+        exit (float): Speed at the end, in mm/s.
+        cruise (float): Highest speed allowed, in mm/s.
+        acceleration (float): Acceleration in mm/s^2.
+
+    Returns:
+        float: The time in seconds.
+    """
+    if length <= 0:
+        return 0.0
+    accelerating = (cruise * cruise - entry * entry) / (2 * acceleration)
+    decelerating = (cruise * cruise - exit * exit) / (2 * acceleration)
+    if accelerating + decelerating <= length:
+        return (cruise - entry) / acceleration + (cruise - exit) / acceleration \
+            + (length - accelerating - decelerating) / cruise
+    # The move is too short to reach the cruise speed
+    peak = math.sqrt((2 * acceleration * length + entry * entry + exit * exit) / 2)
+    return (peak - entry) / acceleration + (peak - exit) / acceleration
+
+def junction_speed(previous, following, acceleration, deviation):
+    """
+    Returns the highest speed at which the machine can turn from one direction to another.
+
+    Args:
+        previous (tuple): Unit direction (dx, dy) of the move into the corner.
+        following (tuple): Unit direction (dx, dy) of the move out of the corner.
+        acceleration (float): Acceleration in mm/s^2.
+        deviation (float): Junction deviation in mm.
+
+    Returns:
+        float: The speed in mm/s (infinite for a straight line).
+    """
+    cos_theta = -(previous[0] * following[0] + previous[1] * following[1])
+    sin_half = math.sqrt(max(0.5 * (1 - cos_theta), 0.0))
+    if sin_half >= 0.999999:
+        return math.inf
+    return math.sqrt(acceleration * deviation * sin_half / (1 - sin_half))
+
+class MotionPlanner:
+    """
+    Adds up the time of a stream of moves. Moves are buffered until twice the lookahead
+    is queued; the first half is then timed with speeds planned over the whole buffer,
+    assuming the machine must be able to stop at the end of it.
+    """
+
+    def __init__(self, acceleration, lookahead=DEFAULT_LOOKAHEAD):
+        self.acceleration = acceleration
+        self.lookahead = max(lookahead, 1)
+        self.moves = [] # (length, cruise speed, highest entry speed, is travel)
+        self.entry = 0.0 # Speed at the start of the first buffered move
+        self.draw_time = 0.0
+        self.travel_time = 0.0
+
+    def add(self, length, cruise, junction, travel):
+        """
+        Queues a move.
+
+        Args:
+            length (float): Length in mm.
+            cruise (float): Highest speed in mm/s.
+            junction (float): Highest speed at the corner into this move, in mm/s.
+            travel (bool): If it is a travel (G0) move.
+        """
+        self.moves.append((length, cruise, junction, travel))
+        if len(self.moves) >= 2 * self.lookahead:
+            self._plan(self.lookahead)
+
+    def stop(self):
+        """Times every queued move, coming to a stop after the last one."""
+        self._plan(len(self.moves))
+        self.entry = 0.0
+
+    def _plan(self, count):
+        acceleration = self.acceleration
+        # Backward pass: the fastest each move may be entered and still stop in time
+        highest = [0.0] * (len(self.moves) + 1)
+        for k in range(len(self.moves) - 1, -1, -1):
+            length, cruise, junction, _ = self.moves[k]
+            highest[k] = min(junction, cruise, math.sqrt(highest[k + 1] ** 2 + 2 * acceleration * length))
+        # Forward pass over the moves that are timed now
+        entry = self.entry
+        for k in range(count):
+            length, cruise, _, travel = self.moves[k]
+            exit = min(highest[k + 1], math.sqrt(entry * entry + 2 * acceleration * length))
+            if travel:
+                self.travel_time += move_time(length, entry, exit, cruise, acceleration)
+            else:
+                self.draw_time += move_time(length, entry, exit, cruise, acceleration)
+            entry = exit
+        self.entry = entry
+        del self.moves[:count]
+
+
+def arc_length(start, end, centre, clockwise):
+    """Returns the length of a G2 (clockwise) or G3 arc, and the radius."""
+    radius = math.hypot(start[0] - centre[0], start[1] - centre[1])
+    sweep = math.atan2(end[1] - centre[1], end[0] - centre[0]) \
+        - math.atan2(start[1] - centre[1], start[0] - centre[0])
+    if clockwise:
+        sweep = -sweep
+    sweep %= 2 * math.pi
+    if sweep == 0 and start == end:
+        sweep = 2 * math.pi # Full circle
+    return radius * sweep
+
+def analyze_gcode(stream, acceleration=DEFAULT_ACCELERATION, rapid_rate=DEFAULT_RAPID_RATE,
+                  junction_deviation=DEFAULT_JUNCTION_DEVIATION, feed_rate=DEFAULT_FEED_RATE,
+                  lookahead=DEFAULT_LOOKAHEAD):
+    """
+    Reads a G-Code program and measures it.
+
+    Args:
+        stream (iterable): The program, one line at a time.
+        acceleration (float): Acceleration in mm/s^2.
+        rapid_rate (float): Speed of G0 moves in mm/min.
+        junction_deviation (float): Junction deviation in mm, larger values take corners faster.
+        feed_rate (float): Speed of G1/G2/G3 moves in mm/min until the program sets one.
+        lookahead (int): Number of moves the planner looks ahead.
+
+    Returns:
+        dict: Distances in mm, counts, and times in seconds.
+    """
+    stats = {
+        'lines': 0, 'ignored_lines': 0, 'draw_moves': 0, 'travel_moves': 0, 'arcs': 0,
+        'draw_distance': 0.0, 'travel_distance': 0.0, 'pen_lifts': 0, 'dwells': 0,
+        'dwell_time': 0.0,
+    }
+    x = y = 0.0
+    units = 1.0 # mm per program unit
+    absolute = True
+    pen_down = False
+    feed = feed_rate / 60
+    motion_mode = None # Last G0-G3, applies to lines with coordinates but no motion command
+
+    planner = MotionPlanner(acceleration, lookahead)
+    # Direction and speed at the end of the previous move, None after a stop
+    last_direction = None
+    last_cruise = 0.0
+
+    for line in stream:
+        stats['lines'] += 1
+        code = line.split(';', 1)[0].strip().upper()
+        if '(' in code:
+            code = re.sub(r'\(.*?\)', '', code)
+        if not code:
+            continue
+        if not BLOCK.fullmatch(code):
+            stats['ignored_lines'] += 1
+            continue
+        words = WORD.findall(code)
+        values = {}
+        commands = []
+        for letter, number in words:
+            if letter in 'GM':
+                commands.append((letter, float(number)))
+            else:
+                values[letter] = float(number)
+        if 'F' in values:
+            feed = values['F'] * units / 60
+
+        motion = next((int(number) for letter, number in commands if letter == 'G' and number in (0, 1, 2, 3)), None)
+        if motion is not None:
+            motion_mode = motion
+        elif not any(letter == 'G' and number in AXIS_WORD_COMMANDS for letter, number in commands):
+            motion = motion_mode
+        for letter, number in commands:
+            if letter == 'G' and number == 20:
+                units = 25.4
+            elif letter == 'G' and number == 21:
+                units = 1.0
+            elif letter == 'G' and number == 90:
+                absolute = True
+            elif letter == 'G' and number == 91:
+                absolute = False
+            elif letter == 'G' and number == 4:
+                # The machine comes to a stop before dwelling
+                planner.stop()
+                last_direction = None
+                stats['dwells'] += 1
+                stats['dwell_time'] += values.get('P', 0.0) + values.get('S', 0.0)
+            elif letter == 'M' and number in (PEN_UP, PEN_DOWN):
+                planner.stop()
+                last_direction = None
+                if number == PEN_UP and pen_down:
+                    stats['pen_lifts'] += 1
+                pen_down = number == PEN_DOWN
+
+        if motion is None or not ('X' in values or 'Y' in values):
+            continue
+        if absolute:
+            target = (values['X'] * units if 'X' in values else x, values['Y'] * units if 'Y' in values else y)
+        else:
+            target = (x + values.get('X', 0.0) * units, y + values.get('Y', 0.0) * units)
+
+        dx, dy = target[0] - x, target[1] - y
+        chord = math.hypot(dx, dy)
+        if motion in (2, 3):
+            centre = (x + values.get('I', 0.0) * units, y + values.get('J', 0.0) * units)
+            length = arc_length((x, y), target, centre, motion == 2)
+            stats['arcs'] += 1
+            # Tangents at both ends, for the corners before and after the arc
+            sign = -1 if motion == 2 else 1
+            radius = max(math.hypot(x - centre[0], y - centre[1]), 1e-12)
+            start_direction = (-sign * (y - centre[1]) / radius, sign * (x - centre[0]) / radius)
+            end_direction = (-sign * (target[1] - centre[1]) / radius, sign * (target[0] - centre[0]) / radius)
+        else:
+            length = chord
+            start_direction = end_direction = (dx / chord, dy / chord) if chord else (0.0, 0.0)
+        travel = motion == 0
+        if travel:
+            stats['travel_moves'] += 1
+            stats['travel_distance'] += length
+        else:
+            stats['draw_moves'] += 1
+            stats['draw_distance'] += length
+        x, y = target
+        if length == 0:
+            continue
+
+        cruise = rapid_rate / 60 if travel else feed
+        if last_direction is None:
+            junction = 0.0
+        else:
+            junction = min(junction_speed(last_direction, start_direction, acceleration, junction_deviation),
+                           last_cruise)
+        planner.add(length, cruise, junction, travel)
+        last_direction = end_direction
+        last_cruise = cruise
+
+    planner.stop()
+    stats['draw_time'] = planner.draw_time
+    stats['travel_time'] = planner.travel_time
+    stats['total_time'] = stats['draw_time'] + stats['travel_time'] + stats['dwell_time']
+    return stats
+
+def format_duration(seconds):
+    """Formats seconds as h:mm:ss."""
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+def main():
+    """
+    Main function to parse arguments, analyse the G-Code and print the report.
+    """
+    parser = argparse.ArgumentParser(
+        description='Estimate the plotting time of a G-Code file.'
+    )
+    parser.add_argument(
+        'filename',
+        help='The G-Code file to analyse.'
+    )
+    parser.add_argument(
+        '--accel',
+        type=float,
+        default=DEFAULT_ACCELERATION,
+        help=f'Acceleration in mm/s^2 (default: {DEFAULT_ACCELERATION}).'
+    )
+    parser.add_argument(
+        '--rapid-rate',
+        type=float,
+        default=DEFAULT_RAPID_RATE,
+        help=f'Speed of G0 travel moves in mm/min (default: {DEFAULT_RAPID_RATE}).'
+    )
+    parser.add_argument(
+        '--feed-rate',
+        type=float,
+        default=DEFAULT_FEED_RATE,
+        help=f'Drawing speed in mm/min until the file sets one with F (default: {DEFAULT_FEED_RATE}).'
+    )
+    parser.add_argument(
+        '--junction-deviation',
+        type=float,
+        default=DEFAULT_JUNCTION_DEVIATION,
+        help=f'Junction deviation in mm, larger values take corners faster (default: {DEFAULT_JUNCTION_DEVIATION}).'
+    )
+    parser.add_argument(
+        '--lookahead',
+        type=int,
+        default=DEFAULT_LOOKAHEAD,
+        help=f'Number of moves the planner looks ahead (default: {DEFAULT_LOOKAHEAD}).'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the report as JSON.'
+    )
+    args = parser.parse_args()
+
+    try:
+        with open_text(args.filename) as stream:
+            stats = analyze_gcode(stream, args.accel, args.rapid_rate, args.junction_deviation, args.feed_rate,
+                                  args.lookahead)
+    except FileNotFoundError:
+        print(f"Error: The file '{args.filename}' was not found.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+    print(f"Draw:   {stats['draw_distance']:12.1f} mm in {stats['draw_moves']} moves "
+          f"({stats['arcs']} arcs), {format_duration(stats['draw_time'])}")
+    print(f"Travel: {stats['travel_distance']:12.1f} mm in {stats['travel_moves']} moves, "
+          f"{format_duration(stats['travel_time'])}")
+    print(f"Pen lifts: {stats['pen_lifts']}, dwells: {stats['dwells']} ({format_duration(stats['dwell_time'])})")
+    print(f"Estimated time: {format_duration(stats['total_time'])}")
+    if stats['ignored_lines']:
+        print(f"Skipped {stats['ignored_lines']} lines that are not G-Code.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+# gcode_writer.py
+#
+# Description:
+#   Streams polylines straight to G-Code. Points are scaled to the printable area with
+#   NumPy and formatted in chunks, so memory use does not grow with the size of the job.
+#   The scaling and rotation rules are the same as turtle_gcode's write_gcode.
+
+import math
+from collections import namedtuple
+
+import numpy as np
+from arc_fit import fit_arcs
+
+# --- G-Code template ---
+HEADER = """;### Header ###
+
+G21
+G90
+F2000
+M03
+G0 X0 Y0
+G04 P1
+
+;### First line of the gcode ###
+"""
+
+AFTER_FIRST_MOVE = """
+;### Stuff to be inserted after the first G0 ###
+M05
+G04 P1
+
+;### Rest of the gcode ###
+"""
+
+FOOTER = """;### Footer ###
+
+M03
+G04 P1
+G0 X0 Y0
+
+"""
+
+# Number of points formatted per write
+CHUNK_SIZE = 65536
+
+# scale: turtle units to machine units
+# rotate: if the drawing is rotated by 90 degrees
+# offset: machine position of the turtle origin
+# top, bottom: vertical extent of the drawing in turtle coordinates
+ScaleInfo = namedtuple('ScaleInfo', ['scale', 'rotate', 'offset', 'top', 'bottom'])
+
+# A stroke drawn by turtle.circle() without steps, kept as a true circular arc
+# centre: centre of the circle in turtle coordinates
+# radius: the turtle radius, negative when the turtle turned clockwise
+# extent: angle swept in degrees, negative when the turtle drew backwards
+Arc = namedtuple('Arc', ['centre', 'radius', 'extent'])
+
+
+def arc_bounds(start, arc):
+    """
+    Returns the bounding box of an arc.
+
+    Args:
+        start (tuple): (x, y) where the arc starts, in turtle coordinates.
+        arc (Arc): The arc.
+
+    Returns:
+        tuple: (left, bottom, right, top) in turtle coordinates.
+    """
+    cx, cy = arc.centre
+    r = abs(arc.radius)
+    sweep = math.radians(arc.extent) if arc.radius > 0 else -math.radians(arc.extent)
+    if abs(sweep) >= math.tau:
+        return cx - r, cy - r, cx + r, cy + r
+    first = math.atan2(start[1] - cy, start[0] - cx)
+    low, high = sorted((first, first + sweep))
+    # The arc reaches the far side of the circle wherever it crosses a multiple of 90 degrees
+    angles = [low, high] + [k * math.pi / 2 for k in range(math.ceil(low / (math.pi / 2)),
+                                                           math.floor(high / (math.pi / 2)) + 1)]
+    xs = [cx + r * math.cos(angle) for angle in angles]
+    ys = [cy + r * math.sin(angle) for angle in angles]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def compute_scale(polylines, width, height, x=0, y=0, allow_rotation=False, arcs=None):
+    """
+    Works out how to fit the drawing into the printable area.
+
+    Args:
+        polylines (list): List of (N, 2) arrays (or lists of points) in turtle coordinates.
+        width (float): The width of the printable area.
+        height (float): The height of the printable area.
+        x (float): The x coordinate of the bottom left corner of the printable area.
+        y (float): The y coordinate of the bottom left corner of the printable area.
+        allow_rotation (bool): Rotate the drawing by 90 degrees if that lets it be drawn bigger.
+        arcs (dict): Arc of every polyline (by index) that is drawn as a true arc.
+
+    Returns:
+        ScaleInfo: The scaling to apply, or None if there is nothing to draw.
+    """
+    if width <= 0:
+        raise ValueError("Cannot write to a G-Code area with a negative or zero width")
+    if height <= 0:
+        raise ValueError("Cannot write to a G-Code area with a negative or zero height")
+    if not polylines:
+        return None
+
+    lows = np.array([np.min(points, axis=0) for points in polylines])
+    highs = np.array([np.max(points, axis=0) for points in polylines])
+    for index, arc in (arcs or {}).items():
+        bounds = arc_bounds(polylines[index][0], arc)
+        lows[index] = bounds[:2]
+        highs[index] = bounds[2:]
+    left, bottom = lows.min(axis=0).tolist()
+    right, top = highs.max(axis=0).tolist()
+
+    turtle_width = right - left
+    turtle_height = top - bottom
+    rotate = False
+    scale_width = width / turtle_width if turtle_width else np.inf
+    scale_height = height / turtle_height if turtle_height else np.inf
+    if ((turtle_width > turtle_height) != (width > height)) and allow_rotation:
+        rotate = True
+        scale_width = width / turtle_height if turtle_height else np.inf
+        scale_height = height / turtle_width if turtle_width else np.inf
+    scale = min(scale_width, scale_height)
+
+    if rotate:
+        offset = (x - bottom * scale, y - left * scale)
+    else:
+        offset = (x - left * scale, y - bottom * scale)
+    return ScaleInfo(scale, rotate, offset, top, bottom)
+
+
+def machine_coordinates(points, info):
+    """
+    Converts turtle coordinates to machine coordinates.
+
+    Args:
+        points (np.array): (N, 2) array of points in turtle coordinates.
+        info (ScaleInfo): The scaling to apply.
+
+    Returns:
+        np.array: (N, 2) array of points in machine coordinates.
+    """
+    points = np.asarray(points, dtype=float)
+    machine = np.empty_like(points)
+    if info.rotate:
+        machine[:, 0] = info.offset[0] + (info.top - points[:, 1] + info.bottom) * info.scale
+        machine[:, 1] = info.offset[1] + points[:, 0] * info.scale
+    else:
+        machine[:, 0] = info.offset[0] + points[:, 0] * info.scale
+        machine[:, 1] = info.offset[1] + points[:, 1] * info.scale
+    return machine
+
+
+def format_moves(command, points):
+    """
+    Formats machine coordinates as G-Code moves.
+
+    Args:
+        command (str): The move command, e.g. 'G0' or 'G1'.
+        points (np.array): (N, 2) array of points in machine coordinates.
+
+    Returns:
+        str: One line per point, each ending with a newline.
+    """
+    return (command + " X%.3f Y%.3f\n") * len(points) % tuple(points.ravel().tolist())
+
+
+def format_arc_moves(points, tolerance, chunk_size=CHUNK_SIZE):
+    """
+    Formats a polyline as G1 moves, replacing runs that lie on a circle with G2/G3 arcs.
+
+    Args:
+        points (np.array): (N, 2) array of points in machine coordinates, the first one
+            being the current position.
+        tolerance (float): Maximum distance between the polyline and the arcs.
+        chunk_size (int): Maximum number of moves formatted at once.
+
+    Yields:
+        str: G-Code text, made of complete lines.
+    """
+    # The controller measures I and J from the position it was sent, not the exact one
+    sent = np.round(points, 3)
+    lines = []
+    start = 0
+    for end, centre, ccw in fit_arcs(points, tolerance):
+        if centre is None:
+            lines.append("G1 X%.3f Y%.3f\n" % tuple(points[end].tolist()))
+        else:
+            x, y = points[end].tolist()
+            i, j = (centre - sent[start]).tolist()
+            lines.append("%s X%.3f Y%.3f I%.3f J%.3f\n" % ("G3" if ccw else "G2", x, y, i, j))
+        start = end
+        if len(lines) >= chunk_size:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines)
+
+
+def format_arc(start, arc, info):
+    """
+    Formats an arc as G2/G3 moves with I/J centre offsets, the way turtle_gcode writes
+    circles: full turns go back to the start point, then one move ends the arc.
+
+    Args:
+        start (tuple): (x, y) where the arc starts, in turtle coordinates.
+        arc (Arc): The arc.
+        info (ScaleInfo): The scaling to apply.
+
+    Returns:
+        str: The moves, each ending with a newline.
+    """
+    cx, cy = arc.centre
+    ccw = (arc.radius > 0) == (arc.extent > 0)
+    command = "G3" if ccw else "G2"
+    i, j = (cx - start[0]) * info.scale, (cy - start[1]) * info.scale
+    if info.rotate:
+        # The drawing is turned a quarter turn counter-clockwise, and so are the offsets
+        i, j = -j, i
+    angle = math.atan2(start[1] - cy, start[0] - cx)
+    extent = abs(math.radians(arc.extent))
+
+    ends = []
+    while extent > math.tau:
+        ends.append(start)
+        extent -= math.tau
+    angle = angle + extent if ccw else angle - extent
+    ends.append((cx + abs(arc.radius) * math.cos(angle), cy + abs(arc.radius) * math.sin(angle)))
+    return "".join("%s X%.3f Y%.3f I%.3f J%.3f\n" % (command, x, y, i, j)
+                   for x, y in machine_coordinates(ends, info).tolist())
+
+
+def first_move(polylines, info):
+    """Returns the G0 line that moves to the start of the drawing, without a newline."""
+    return format_moves("G0", machine_coordinates(np.asarray(polylines[0])[:1], info)).rstrip("\n")
+
+
+def iter_moves(polylines, info, penup_command=None, pendown_command=None, chunk_size=CHUNK_SIZE,
+               arc_tolerance=None, arcs=None):
+    """
+    Yields the G-Code for the drawing after its first G0 move, in chunks of text.
+
+    A travel move, wrapped in the pen up and pen down commands, is only emitted when a
+    polyline does not start where the previous one ended.
+
+    Args:
+        polylines (list): List of (N, 2) arrays (or lists of points) in turtle coordinates.
+        info (ScaleInfo): The scaling to apply.
+        penup_command (str): G-Code sent before each travel move, or None.
+        pendown_command (str): G-Code sent after each travel move, or None.
+        chunk_size (int): Maximum number of points formatted at once.
+        arc_tolerance (float): If set, runs of points on a circle are sent as G2/G3 arcs
+            that stay within this distance (in machine units) of the polyline.
+        arcs (dict): Arc of every polyline (by index) that is drawn as a true arc instead
+            of through its points, see RecordingTurtle.arcs.
+
+    Yields:
+        str: G-Code text, made of complete lines.
+    """
+    if penup_command is not None:
+        penup_command = penup_command.strip() + "\n"
+    if pendown_command is not None:
+        pendown_command = pendown_command.strip() + "\n"
+
+    arcs = arcs or {}
+    last_position = tuple(polylines[0][0])
+    for index, points in enumerate(polylines):
+        points = np.asarray(points, dtype=float)
+        if tuple(points[0]) != last_position:
+            travel = format_moves("G0", machine_coordinates(points[:1], info))
+            yield (penup_command or "") + travel + (pendown_command or "")
+        if index in arcs:
+            yield format_arc(tuple(points[0]), arcs[index], info)
+        elif arc_tolerance is not None:
+            yield from format_arc_moves(machine_coordinates(points, info), arc_tolerance, chunk_size)
+        else:
+            for start in range(1, len(points), chunk_size):
+                yield format_moves("G1", machine_coordinates(points[start:start + chunk_size], info))
+        last_position = tuple(points[-1])
+
+
+def write_template(stream, first_line, body):
+    """
+    Writes G-Code wrapped in the plotter's header and footer.
+
+    Args:
+        stream (file): Text stream to write to.
+        first_line (str): The first move of the drawing.
+        body (iterable): Chunks of G-Code text for the rest of the drawing.
+    """
+    stream.write(HEADER)
+    stream.write(first_line + "\n")
+    stream.write(AFTER_FIRST_MOVE)
+    empty = True
+    for chunk in body:
+        stream.write(chunk)
+        empty = empty and not chunk
+    if empty:
+        stream.write("\n")
+    stream.write(FOOTER)
+
+
+def write_gcode(stream, polylines, width, height, x=0, y=0, allow_rotation=False,
+                penup_command=None, pendown_command=None, chunk_size=CHUNK_SIZE, arc_tolerance=None, arcs=None):
+    """
+    Streams a drawing to G-Code, scaled to fit the printable area.
+
+    Args:
+        stream (file): Text stream to write to, e.g. sys.stdout or an open file.
+        polylines (list): List of (N, 2) arrays (or lists of points) in turtle coordinates.
+        width (float): The width of the printable area.
+        height (float): The height of the printable area.
+        x (float): The x coordinate of the bottom left corner of the printable area.
+        y (float): The y coordinate of the bottom left corner of the printable area.
+        allow_rotation (bool): Rotate the drawing by 90 degrees if that lets it be drawn bigger.
+        penup_command (str): G-Code sent before each travel move, or None.
+        pendown_command (str): G-Code sent after each travel move, or None.
+        chunk_size (int): Maximum number of points formatted at once.
+        arc_tolerance (float): If set, runs of points on a circle are sent as G2/G3 arcs
+            that stay within this distance (in machine units) of the polyline.
+        arcs (dict): Arc of every polyline (by index) that is drawn as a true arc, see
+            RecordingTurtle.arcs.
+    """
+    info = compute_scale(polylines, width, height, x, y, allow_rotation, arcs)
+    if info is None:
+        write_template(stream, "", [])
+        return
+    write_template(stream, first_move(polylines, info),
+                   iter_moves(polylines, info, penup_command, pendown_command, chunk_size, arc_tolerance, arcs))
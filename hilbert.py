@@ -1,79 +1,104 @@
 import turtle
-
-def hilbert_A(level, angle, step, t):
+from functools import lru_cache
+
+import numpy as np
+from recording_turtle import draw_polyline
+
+# --- Curve Parameters ---
+LEVEL = 6
+SIZE = 500  # Overall size of the curve's bounding box
+
+# --- Table-driven index -> (x, y) mapping ---
+# Each base-4 digit of a curve index picks a quadrant, visited in the order below. The
+# sub-curve inside a quadrant is the parent curve transformed by one of four symmetries.
+QUADRANT_BITS = [(0, 0), (0, 1), (1, 1), (1, 0)]
+SYMMETRIES = [
+    lambda a, b: (a, b),         # identity
+    lambda a, b: (b, a),         # transpose
+    lambda a, b: (1 - b, 1 - a), # anti-transpose
+    lambda a, b: (1 - a, 1 - b), # rotate 180 degrees
+]
+QUADRANT_SYMMETRY = [1, 0, 0, 2]
+MAX_LEVEL = 14 # x and y are packed into 14 bits each
+
+def compose_symmetries(first, second):
+    """Returns the index of the symmetry that applies `second` and then `first`."""
+    for index, symmetry in enumerate(SYMMETRIES):
+        if all(symmetry(a, b) == SYMMETRIES[first](*SYMMETRIES[second](a, b)) for a in (0, 1) for b in (0, 1)):
+            return index
+
+@lru_cache(maxsize=None)
+def hilbert_table(digits):
     """
-    Draws a Hilbert curve with a '|_|' orientation.
-    This corresponds to one of the two recursive rules for the curve.
-    It ensures the drawing expands upwards and sideways from the start.
+    Builds the lookup table that maps a symmetry state and `digits` base-4 index digits
+    to the matching x and y bits and the next state.
 
     Args:
-        level (int): The recursion level.
-        angle (int): The angle to turn (always 90).
-        step (int): The length of each segment.
-        t (turtle.Turtle): The turtle object to draw with.
+        digits (int): Number of base-4 digits handled per lookup (1 to 4).
+
+    Returns:
+        np.array: Table indexed by (state << 8) | digits, holding (state << 28) | (x << 14) | y.
     """
-    # Base case: at level 0, we do nothing.
-    if level == 0:
-        return
-
-    t.left(angle)
-    hilbert_B(level - 1, angle, step, t) # First sub-curve
-    t.forward(step)
-    t.right(angle)
-    hilbert_A(level - 1, angle, step, t) # Second sub-curve
-    t.forward(step)
-    hilbert_A(level - 1, angle, step, t) # Third sub-curve
-    t.right(angle)
-    t.forward(step)
-    hilbert_B(level - 1, angle, step, t) # Fourth sub-curve
-    t.left(angle)
-
-def hilbert_B(level, angle, step, t):
+    count = 4 ** digits
+    table = np.zeros(4 * 256, dtype=np.uint32)
+    for start_state in range(4):
+        for value in range(count):
+            state, x, y = start_state, 0, 0
+            for shift in range(2 * (digits - 1), -1, -2):
+                quadrant = (value >> shift) & 3
+                a, b = SYMMETRIES[state](*QUADRANT_BITS[quadrant])
+                x, y = x << 1 | a, y << 1 | b
+                state = compose_symmetries(state, QUADRANT_SYMMETRY[quadrant])
+            table[start_state << 8 | value] = state << 28 | x << 14 | y
+    return table
+
+def hilbert_points(level, size):
     """
-    Draws a Hilbert curve with a '|-|' orientation.
-    This is the second of the two mutually recursive rules.
+    Computes every vertex of a Hilbert curve directly from its index.
+
+    The index -> (x, y) mapping is evaluated for all 4**level indices at once, four
+    base-4 digits per table lookup. The curve starts in the lower-left corner, first
+    heads up, and ends in the lower-right corner (an upside-down U at level 1).
 
     Args:
-        level (int): The recursion level.
-        angle (int): The angle to turn (always 90).
-        step (int): The length of each segment.
-        t (turtle.Turtle): The turtle object to draw with.
-    """
-    # Base case: at level 0, we do nothing.
-    if level == 0:
-        return
-
-    t.right(angle)
-    hilbert_A(level - 1, angle, step, t) # First sub-curve
-    t.forward(step)
-    t.left(angle)
-    hilbert_B(level - 1, angle, step, t) # Second sub-curve
-    t.forward(step)
-    hilbert_B(level - 1, angle, step, t) # Third sub-curve
-    t.left(angle)
-    t.forward(step)
-    hilbert_A(level - 1, angle, step, t) # Fourth sub-curve
-    t.right(angle)
+        level (int): The recursion level (at most MAX_LEVEL).
+        size (float): Width and height of the curve's bounding box.
 
+    Returns:
+        np.array: (4**level, 2) array of vertices, with the lower-left corner at (0, 0).
+    """
+    if level > MAX_LEVEL:
+        raise ValueError(f"Hilbert curves are limited to level {MAX_LEVEL}.")
+
+    index = np.arange(4 ** level, dtype=np.uint32)
+    xy = np.zeros_like(index)
+    state = np.zeros_like(index)
+    key = np.empty_like(index)
+    remaining = level
+    while remaining:
+        digits = remaining % 4 or 4 # The leading lookup takes the leftover digits
+        remaining -= digits
+        np.right_shift(index, np.uint32(2 * remaining), out=key)
+        key &= np.uint32(255)
+        key |= state
+        entry = hilbert_table(digits)[key]
+        xy <<= np.uint32(digits)
+        xy |= entry & np.uint32((1 << 28) - 1)
+        np.right_shift(entry, np.uint32(20), out=state) # Next state, ready to be OR-ed into the key
+
+    step = size / (2 ** level - 1) if level else 0
+    points = np.empty((len(xy), 2))
+    points[:, 0] = xy >> np.uint32(14)
+    points[:, 1] = xy & np.uint32((1 << 14) - 1)
+    points *= step
+    return points
 
 def draw(t):
-    # --- Curve Parameters ---
-    level = 6
-    size = 500  # Overall size of the curve's bounding box
-    # Calculate the step size based on the level and overall size
-    step = size / (2 ** level - 1)
-    angle = 90
-
-    # --- Initial Positioning ---
-    t.penup()
-    # Position the turtle at the lower-left corner of the drawing area.
-    # The turtle starts facing East (0 degrees) by default.
-    t.goto(-size / 2, -size / 2)
-    t.pendown()
-
     # --- Start Drawing ---
-    # We start with hilbert_A to get the upward-opening curve.
-    hilbert_A(level, angle, step, t)
+    # Compute all vertices at once and draw them as one polyline, starting
+    # at the lower-left corner of the drawing area.
+    points = hilbert_points(LEVEL, SIZE) - SIZE / 2
+    draw_polyline(t, points)
 
 def main():
     """
@@ -1,65 +1,101 @@
 import matplotlib.pyplot as plt
 import numpy as np
+from line_render import draw_polylines
+
+# 60 degree rotation used to find the tip of each triangle
+ROTATION_60 = np.array([[np.cos(np.pi/3), -np.sin(np.pi/3)],
+                        [np.sin(np.pi/3), np.cos(np.pi/3)]])
+
+# Deepest level worth drawing on screen: 4**8 segments are already well below a pixel.
+# Deeper curves (depth 14 is 4.3 GB of points) belong in save_koch_curve.
+MAX_DISPLAY_DEPTH = 8
+
+def refine_koch_points(points, depth, chunk_size=None):
+    """
+    Fills in a Koch Curve in place, one level of detail per step.
+
+    The array holds all 4**depth + 1 points of the final curve. Only its first and last
+    points need to be set: the points of level k sit at every 4**(depth-k)-th index, so each
+    level fills the gaps of the previous one with strided views and no copying.
+
+    Parameters:
+    points (np.array): (4**depth + 1, 2) array, can be a memory-mapped file.
+    depth (int): The recursion depth, controlling the level of detail of the curve.
+    chunk_size (int): Maximum number of segments refined at once, bounds temporary memory.
+    """
+    stride = 4 ** depth
+    for level in range(depth):
+        quarter = stride // 4
+        num_segments = 4 ** level
+        step = chunk_size or num_segments
+        for first in range(0, num_segments, step):
+            last = min(first + step, num_segments)
+            base = first * stride
+            start_point = points[base:last * stride:stride]
+            end_point = points[base + stride:last * stride + 1:stride]
+
+            delta = end_point - start_point
+            point1 = start_point + delta / 3
+            point2 = end_point - delta / 3
+            point_triangle = point1 + (point2 - point1) @ ROTATION_60.T
+
+            points[base + quarter:last * stride:stride] = point1
+            points[base + 2 * quarter:last * stride:stride] = point_triangle
+            points[base + 3 * quarter:last * stride:stride] = point2
+        stride = quarter
 
 def koch_curve(points, depth):
     """
-    Recursively generates points for the Koch Curve.
+    Generates points for the Koch Curve.
 
     Parameters:
     points (list): A list of two points representing the initial line segment [(x0, y0), (x1, y1)].
     depth (int): The recursion depth, controlling the level of detail of the curve.
 
     Returns:
-    list: A list of points representing the Koch Curve at the given depth.
+    np.array: (4**depth + 1, 2) array of points representing the Koch Curve at the given depth.
     """
-    if depth == 0:
-        return points
-
-    start_point = np.array(points[0])
-    end_point = np.array(points[1])
-
-    delta = end_point - start_point
+    koch_points = np.empty((4 ** depth + 1, 2))
+    koch_points[0] = points[0]
+    koch_points[-1] = points[1]
+    refine_koch_points(koch_points, depth)
+    return koch_points
 
-    point1 = start_point + delta / 3
-    point2 = end_point - delta / 3
-
-    # Calculate the coordinates of the triangle point using rotation
-    v = point2 - point1
-    rotation_matrix = np.array([[np.cos(np.pi/3), -np.sin(np.pi/3)],
-                                [np.sin(np.pi/3), np.cos(np.pi/3)]]) # 60 degrees rotation
-    point_triangle = point1 + rotation_matrix @ v
-
-
-    segment1 = [start_point, point1]
-    segment2 = [point1, point_triangle]
-    segment3 = [point_triangle, point2]
-    segment4 = [point2, end_point]
-
-    # Recursively generate Koch Curve for each segment
-    koch_segment1 = koch_curve(segment1, depth-1)
-    koch_segment2 = koch_curve(segment2, depth-1)
-    koch_segment3 = koch_curve(segment3, depth-1)
-    koch_segment4 = koch_curve(segment4, depth-1)
+def save_koch_curve(filename, points, depth, chunk_size=1 << 20):
+    """
+    Generates the Koch Curve straight into a memory-mapped .npy file, for curves that do
+    not fit in RAM. The file can be read back with np.load(filename, mmap_mode='r').
 
-    # Combine the points, excluding the repeated endpoints to form a continuous curve
-    return koch_segment1[:-1] + koch_segment2[:-1] + koch_segment3[:-1] + koch_segment4
+    Parameters:
+    filename (str): Path of the .npy file to write.
+    points (list): A list of two points representing the initial line segment [(x0, y0), (x1, y1)].
+    depth (int): The recursion depth, controlling the level of detail of the curve.
+    chunk_size (int): Maximum number of segments refined at once.
+    """
+    koch_points = np.lib.format.open_memmap(filename, mode='w+', dtype=np.float64, shape=(4 ** depth + 1, 2))
+    koch_points[0] = points[0]
+    koch_points[-1] = points[1]
+    refine_koch_points(koch_points, depth, chunk_size)
+    koch_points.flush()
+    del koch_points
 
 
 def display_koch_curve(depth):
     """
-    Displays the Koch Curve using matplotlib.
+    Displays the Koch Curve using matplotlib. Depths above MAX_DISPLAY_DEPTH are drawn at
+    MAX_DISPLAY_DEPTH, which looks the same on screen; use save_koch_curve to generate them.
 
     Parameters:
     depth (int): The recursion depth for the Koch Curve.
     """
+    if depth > MAX_DISPLAY_DEPTH:
+        print(f"Depth {depth} is too fine to display, drawing depth {MAX_DISPLAY_DEPTH} instead.")
+        depth = MAX_DISPLAY_DEPTH
     initial_points = [(0, 0), (1, 0)] # Start with a horizontal line from (0,0) to (1,0)
     koch_points = koch_curve(initial_points, depth)
 
-    x_coords = [point[0] for point in koch_points]
-    y_coords = [point[1] for point in koch_points]
-
     plt.figure(figsize=(8, 8)) # Adjust figure size for better visualization
-    plt.plot(x_coords, y_coords, linewidth=1) # Adjust linewidth for line thickness
+    draw_polylines(plt.gca(), [koch_points], color='C0', linewidth=1) # Adjust linewidth for line thickness
     plt.title(f'Koch Curve - Depth {depth}')
     plt.xlabel('X')
     plt.ylabel('Y')
@@ -69,5 +105,5 @@ def display_koch_curve(depth):
 
 
 if __name__ == '__main__':
-    curve_depth = 14  # You can change the depth to control the complexity
+    curve_depth = 8  # You can change the depth to control the complexity (up to MAX_DISPLAY_DEPTH)
     display_koch_curve(curve_depth)
\ No newline at end of file
@@ -0,0 +1,42 @@
+import numpy as np
+from matplotlib.collections import LineCollection
+
+def draw_segments(ax, segments, color='black', linewidth=1):
+    """
+    Draws many line segments as a single LineCollection artist.
+
+    Parameters:
+    ax (matplotlib.axes.Axes): The axes to draw on.
+    segments (np.array): (N, 2, 2) array of segments, segments[i] = [(x0, y0), (x1, y1)].
+    color (str): Line color.
+    linewidth (float): Line width.
+
+    Returns:
+    LineCollection: The artist that was added to the axes.
+    """
+    collection = LineCollection(np.asarray(segments, dtype=float), colors=color, linewidths=linewidth)
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return collection
+
+def draw_polylines(ax, polylines, color='black', linewidth=1):
+    """
+    Draws several polylines as one Line2D artist, separating them with NaN points.
+
+    Parameters:
+    ax (matplotlib.axes.Axes): The axes to draw on.
+    polylines (list): List of (M, 2) arrays of points.
+    color (str): Line color.
+    linewidth (float): Line width.
+
+    Returns:
+    Line2D: The artist that was added to the axes.
+    """
+    polylines = [np.asarray(points, dtype=float) for points in polylines]
+    points = np.full((sum(len(line) + 1 for line in polylines), 2), np.nan)
+    start = 0
+    for line in polylines:
+        points[start:start + len(line)] = line
+        start += len(line) + 1 # Leave a NaN row between polylines
+    line, = ax.plot(points[:, 0], points[:, 1], color=color, linewidth=linewidth)
+    return line
@@ -1,7 +1,12 @@
 import matplotlib.pyplot as plt
 import numpy as np
+from itertools import islice
+from line_render import draw_segments
+from lsystem_engine import expand_l_system
 
-def create_l_system(axiom, rules, iterations):
+CHUNK_SIZE = 1 << 16 # Symbols interpreted per vectorized pass when streaming a generator
+
+def create_l_system(axiom, rules, iterations, max_length=None):
     """
     Generates an L-System string based on the axiom, rules, and number of iterations.
 
@@ -9,54 +14,165 @@ def create_l_system(axiom, rules, iterations):
     axiom (str): The initial string.
     rules (dict): A dictionary of replacement rules (e.g., {'F': 'F+F-F-F+F'}).
     iterations (int): The number of iterations to apply the rules.
+    max_length (int): Refuse to build strings longer than this (default: no limit).
 
     Returns:
     str: The generated L-System string.
     """
-    string = axiom
-    for _ in range(iterations):
-        next_string = ""
-        for char in string:
-            next_string += rules.get(char, char) # Apply rule if it exists, otherwise keep the character
-        string = next_string
-    return string
-
-def draw_l_system(string, angle, step):
+    return expand_l_system(axiom, rules, iterations, max_length)
+
+def stack_cumsum(values, depth, start=None):
     """
-    Draws an L-System fractal based on the L-System string using turtle-like graphics in matplotlib.
+    Cumulative sum that understands L-System branching: after a ']' the running total
+    goes back to the value it had at the matching '['.
+
+    The total at position i is the sum of the values at each bracket depth up to the
+    depth of i, counted since the last position where that depth was closed.
+
+    Parameters:
+    values (np.array): Per-symbol increments.
+    depth (np.array): Bracket depth after each symbol.
+    start (np.array): Totals carried over from earlier symbols (see branch_totals): the
+        total saved by each '[' still open, then the current total. depth must continue
+        from len(start) - 1. By default the sum starts from 0 at depth 0.
+
+    Returns:
+    np.array: The running total after each symbol.
+    """
+    skip = 0
+    if start is not None:
+        # Replay the carried totals as one symbol per open level, then drop them again
+        skip = len(start)
+        values = np.concatenate([np.diff(start, prepend=0.0), values])
+        depth = np.concatenate([np.arange(skip), depth])
+
+    total = np.zeros(len(values))
+    index = np.arange(len(values))
+    for level in range(int(depth.max(initial=0)) + 1):
+        running = np.cumsum(np.where(depth == level, values, 0))
+        # Last position (before or at i) where this level was closed
+        last_break = np.maximum.accumulate(np.where(depth < level, index, -1))
+        base = np.where(last_break >= 0, running[last_break], 0)
+        total += np.where(depth >= level, running - base, 0)
+    return total[skip:]
+
+def branch_totals(total, depth, start):
+    """
+    Totals to carry over to the next symbols, in the form stack_cumsum takes as start.
+
+    Parameters:
+    total (np.array): Running totals from stack_cumsum.
+    depth (np.array): Bracket depth after each symbol.
+    start (np.array): The start the totals were computed from.
+
+    Returns:
+    np.array: The total saved by each '[' still open, then the current total.
+    """
+    if not len(total):
+        return start
+    levels = int(depth[-1])
+    carried = np.empty(levels + 1)
+    for level in range(levels):
+        # The last '[' opened at this level saved the total of the symbol before it
+        at_level = np.flatnonzero(depth == level)
+        carried[level] = total[at_level[-1]] if at_level.size else start[level]
+    carried[levels] = total[-1]
+    return carried
+
+def l_system_chunk_segments(string, angle, step, state=None):
+    """
+    Computes the line segments of one piece of an L-System string, continuing from where
+    the previous piece left the turtle.
+
+    Parameters:
+    string (str): The piece of the L-System string to interpret.
+    angle (float): The angle of rotation in degrees.
+    step (float): The step size for forward movements.
+    state (tuple): The state returned for the previous piece, None for the first one.
+
+    Returns:
+    tuple: (segments, state) - (N, 2, 2) array of segments, and the heading and position
+    (with the ones saved by every open '[') to pass with the next piece.
+    """
+    if state is None:
+        state = (np.zeros(1), np.zeros(1), np.zeros(1))
+    heading_start, x_start, y_start = state
+
+    commands = np.frombuffer(string.encode(), dtype=np.uint8)
+    depth = len(heading_start) - 1 + np.cumsum(commands == ord('[')) - np.cumsum(commands == ord(']'))
+    if depth.size and depth.min() < 0:
+        raise ValueError("L-System string closes a branch that was never opened.")
+
+    angle_rad = np.radians(angle)
+    turns = np.zeros(len(commands))
+    turns[commands == ord('+')] = -angle_rad # Turn right
+    turns[commands == ord('-')] = angle_rad # Turn left
+    heading = stack_cumsum(turns, depth, heading_start)
+
+    forward = commands == ord('F')
+    dx = np.zeros(len(commands))
+    dy = np.zeros(len(commands))
+    dx[forward] = step * np.cos(heading[forward])
+    dy[forward] = step * np.sin(heading[forward])
+    x = stack_cumsum(dx, depth, x_start)
+    y = stack_cumsum(dy, depth, y_start)
+
+    segments = np.empty((np.count_nonzero(forward), 2, 2))
+    segments[:, 1, 0] = x[forward]
+    segments[:, 1, 1] = y[forward]
+    segments[:, 0, 0] = segments[:, 1, 0] - dx[forward]
+    segments[:, 0, 1] = segments[:, 1, 1] - dy[forward]
+    state = (branch_totals(heading, depth, heading_start),
+             branch_totals(x, depth, x_start),
+             branch_totals(y, depth, y_start))
+    return segments, state
+
+def l_system_segments(string, angle, step):
+    """
+    Computes every line segment of an L-System drawing in one vectorized pass.
+
+    Headings are the stack-aware cumulative sum of the turn deltas, and positions are the
+    stack-aware cumulative sum of the forward moves along those headings.
 
     Parameters:
     string (str): The L-System string to interpret.
     angle (float): The angle of rotation in degrees.
+    step (float): The step size for forward movements.
+
+    Returns:
+    np.array: (N, 2, 2) array of segments, segments[i] = [(x0, y0), (x1, y1)].
+    """
+    return l_system_chunk_segments(string, angle, step)[0]
+
+def draw_l_system(string, angle, step, chunk_size=CHUNK_SIZE):
+    """
+    Draws an L-System fractal based on the L-System string using turtle-like graphics in matplotlib.
+
+    Parameters:
+    string (str or iterable): The L-System string to interpret, or a generator such as
+        lsystem_engine.iter_l_system that yields its commands one at a time.
+    angle (float): The angle of rotation in degrees.
     step (int): The step size for forward movements.
+    chunk_size (int): Symbols of a generator interpreted per vectorized pass.
     """
-    x, y = 0, 0 # Starting position
-    angle_rad = np.radians(angle) # Convert angle to radians for numpy functions
-    current_angle = 0 # Initial direction (east)
-    stack = [] # Stack for saving position and angle during branching
-    segments = [] # List to store line segments for plotting
-
-    for command in string:
-        if command == 'F': # Move forward and draw line
-            x_new = x + step * np.cos(current_angle)
-            y_new = y + step * np.sin(current_angle)
-            segments.append([(x, y), (x_new, y_new)]) # Store segment
-            x, y = x_new, y_new # Update current position
-        elif command == '+': # Turn right
-            current_angle -= angle_rad
-        elif command == '-': # Turn left
-            current_angle += angle_rad
-        elif command == '[': # Save current position and angle to stack
-            stack.append((x, y, current_angle))
-        elif command == ']': # Restore position and angle from stack (branch end)
-            x, y, current_angle = stack.pop()
+    if isinstance(string, str):
+        segments = l_system_segments(string, angle, step)
+    else:
+        # Never build the whole string: interpret it a chunk at a time
+        symbols = iter(string)
+        pieces, state = [], None
+        while True:
+            chunk = "".join(islice(symbols, chunk_size))
+            if not chunk:
+                break
+            piece, state = l_system_chunk_segments(chunk, angle, step, state)
+            pieces.append(piece)
+        segments = np.concatenate(pieces) if pieces else np.empty((0, 2, 2))
 
     # Plotting using matplotlib
     plt.figure(figsize=(8, 8))
     ax = plt.gca()
-    for start_point, end_point in segments:
-        x_coords, y_coords = zip(start_point, end_point)
-        ax.plot(x_coords, y_coords, 'black', linewidth=1) # Plot each segment
+    draw_segments(ax, segments, color='black', linewidth=1) # One artist for all segments
 
     ax.set_aspect('equal', adjustable='box') # Equal aspect ratio
     ax.axis('off') # Hide axes for cleaner fractal view
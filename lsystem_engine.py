@@ -0,0 +1,125 @@
+from collections import Counter
+
+def compile_rules(rules):
+    """
+    Compiles L-System rules into a translation table for str.translate.
+
+    Parameters:
+    rules (dict): A dictionary of replacement rules (e.g., {'F': 'F+F-F-F+F'}).
+
+    Returns:
+    dict: Translation table mapping character ordinals to their replacement strings.
+    """
+    for symbol in rules:
+        if len(symbol) != 1:
+            raise ValueError(f"L-System rules must replace single characters, got '{symbol}'.")
+    return {ord(symbol): replacement for symbol, replacement in rules.items()}
+
+def expansion_lengths(axiom, rules, iterations):
+    """
+    Computes the length of the L-System string after every iteration without building it.
+    Only the number of each symbol is tracked, so this is cheap even for huge strings.
+
+    Parameters:
+    axiom (str): The initial string.
+    rules (dict): A dictionary of replacement rules.
+    iterations (int): The number of iterations to apply the rules.
+
+    Returns:
+    list: The string length after 0, 1, ..., iterations iterations.
+    """
+    rule_counts = {symbol: Counter(replacement) for symbol, replacement in rules.items()}
+    counts = Counter(axiom)
+    lengths = [len(axiom)]
+    for _ in range(iterations):
+        next_counts = Counter()
+        for symbol, count in counts.items():
+            if symbol in rule_counts:
+                for produced, produced_count in rule_counts[symbol].items():
+                    next_counts[produced] += count * produced_count
+            else:
+                next_counts[symbol] += count
+        counts = next_counts
+        lengths.append(sum(counts.values()))
+    return lengths
+
+def expanded_length(axiom, rules, iterations):
+    """
+    Computes the length of the final L-System string without building it.
+
+    Parameters:
+    axiom (str): The initial string.
+    rules (dict): A dictionary of replacement rules.
+    iterations (int): The number of iterations to apply the rules.
+
+    Returns:
+    int: The length of the generated L-System string.
+    """
+    return expansion_lengths(axiom, rules, iterations)[-1]
+
+def expand_l_system(axiom, rules, iterations, max_length=None):
+    """
+    Generates an L-System string, rewriting the whole string in C with str.translate
+    on every iteration.
+
+    Parameters:
+    axiom (str): The initial string.
+    rules (dict): A dictionary of replacement rules.
+    iterations (int): The number of iterations to apply the rules.
+    max_length (int): Refuse to build strings longer than this (default: no limit).
+
+    Returns:
+    str: The generated L-System string.
+    """
+    if max_length is not None:
+        length = expanded_length(axiom, rules, iterations)
+        if length > max_length:
+            raise ValueError(f"L-System string would have {length} symbols, more than the limit of {max_length}.")
+
+    table = compile_rules(rules)
+    string = axiom
+    for _ in range(iterations):
+        string = string.translate(table)
+    return string
+
+def iter_l_system(axiom, rules, iterations, chunk_size=4096):
+    """
+    Yields the symbols of an L-System string one at a time without ever building it.
+
+    The rewriting tree is walked depth-first with one iterator per level, so memory is
+    bounded by the number of iterations. Sub-trees that expand to at most chunk_size
+    symbols are built once, cached and yielded in one go, which keeps the per-symbol
+    overhead low.
+
+    Parameters:
+    axiom (str): The initial string.
+    rules (dict): A dictionary of replacement rules.
+    iterations (int): The number of iterations to apply the rules.
+    chunk_size (int): Largest sub-tree expansion that is cached as a string.
+
+    Yields:
+    str: The symbols of the generated L-System string, in order.
+    """
+    table = compile_rules(rules)
+    symbol_lengths = {symbol: expansion_lengths(symbol, rules, iterations) for symbol in rules}
+    chunks = {}
+
+    stack = [(iter(axiom), iterations)]
+    while stack:
+        symbols, depth = stack[-1]
+        for symbol in symbols:
+            if depth == 0 or symbol not in rules:
+                yield symbol
+            elif symbol_lengths[symbol][depth] <= chunk_size:
+                chunk = chunks.get((symbol, depth))
+                if chunk is None:
+                    chunk = symbol
+                    for _ in range(depth):
+                        chunk = chunk.translate(table)
+                    chunks[(symbol, depth)] = chunk
+                yield from chunk
+            else:
+                stack.append((iter(rules[symbol]), depth - 1))
+                break
+        else:
+            stack.pop()
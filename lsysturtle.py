@@ -1,6 +1,7 @@
 import turtle
+from lsystem_engine import expand_l_system, expanded_length, iter_l_system
 
-def create_l_system(iterations, axiom, rules):
+def create_l_system(iterations, axiom, rules, max_length=None):
     """
     Generates the final string for the L-system.
 
@@ -8,19 +9,12 @@ def create_l_system(iterations, axiom, rules):
         iterations (int): The number of times to apply the rules.
         axiom (str): The starting string.
         rules (dict): A dictionary of rules to apply.
+        max_length (int): Refuse to build strings longer than this (default: no limit).
 
     Returns:
         str: The final generated string after all iterations.
     """
-    start_string = axiom
-    if iterations == 0:
-        return axiom
-    end_string = ""
-    for _ in range(iterations):
-        end_string = "".join(rules.get(character, character) for character in start_string)
-        start_string = end_string
-
-    return end_string
+    return expand_l_system(axiom, rules, iterations, max_length)
 
 
 def draw_l_system(t, instructions, angle, distance):
@@ -29,7 +23,8 @@ def draw_l_system(t, instructions, angle, distance):
 
     Args:
         t (turtle.Turtle): The turtle object.
-        instructions (str): The string generated by the L-system.
+        instructions (str or iterable): The string generated by the L-system, or a
+            generator such as iter_l_system that yields its commands one at a time.
         angle (float): The angle to turn for '+' and '-' commands.
         distance (float): The distance to move for 'F' commands.
     """
@@ -86,11 +81,11 @@ def draw(t):
     t.pendown()
 
     # --- Generate and Draw ---
-    # 1. Generate the full instruction string
-    instructions = create_l_system(iterations, axiom, rules)
+    # 1. Stream the instructions instead of building the full string
+    instructions = iter_l_system(axiom, rules, iterations)
 
     # 2. Draw the fractal based on the instructions
-    print(f"Drawing L-System with {len(instructions)} commands...")
+    print(f"Drawing L-System with {expanded_length(axiom, rules, iterations)} commands...")
     draw_l_system(t, instructions, angle, distance)
     print("Drawing complete.")
 
@@ -1,45 +1,165 @@
+from functools import partial
+
 import matplotlib.pyplot as plt
 import numpy as np
+from contours import iteration_contours
+from recording_turtle import draw_polyline
+from tiled_render import render_tiled
+
+# --- Plotter drawing (draw) ---
+# View, grid size and iteration limit of the image whose contours are drawn
+DRAW_X_RANGE = (-2.0, 1.0)
+DRAW_Y_RANGE = (-1.5, 1.5)
+DRAW_WIDTH, DRAW_HEIGHT = 600, 600
+DRAW_MAX_ITER = 100
+# Outlines of the points that take at least this many iterations to escape
+# (DRAW_MAX_ITER outlines the set itself)
+CONTOUR_ITERATIONS = [3, 4, 5, 6, 8, 12, 20, 100]
+# How far (in grid pixels) the simplified contours may deviate from the traced ones
+CONTOUR_TOLERANCE = 0.25
+
+def in_main_cardioid_or_bulb(x, y):
+    """
+    Checks if points lie in the main cardioid or the period-2 bulb, which are inside the set.
+
+    Parameters:
+    x (float or np.array): Real parts of the points.
+    y (float or np.array): Imaginary parts of the points.
 
-def mandelbrot(c, max_iter):
+    Returns:
+    bool or np.array: True for the points inside either shape.
+    """
+    q = (x - 0.25) ** 2 + y * y
+    return (q * (q + (x - 0.25)) <= 0.25 * y * y) | ((x + 1) ** 2 + y * y <= 0.0625)
+
+def mandelbrot(c, max_iter, shortcuts=True):
     """
     Checks if a complex number c is in the Mandelbrot set.
 
     Parameters:
     c (complex): The complex number to check.
     max_iter (int): The maximum number of iterations.
+    shortcuts (bool): Skip the iteration for points known to be inside the set: the main
+        cardioid, the period-2 bulb, and orbits that come back exactly to an earlier value.
 
     Returns:
     int: The number of iterations before the sequence escapes, or max_iter if it doesn't escape.
     """
+    if shortcuts and in_main_cardioid_or_bulb(c.real, c.imag):
+        return max_iter
     z = 0
     n = 0
+    saved = 0
+    next_save = 1
     while abs(z) <= 2 and n < max_iter:
         z = z*z + c
         n += 1
+        if shortcuts:
+            # An exact repeat means the orbit cycles forever, so it can never escape
+            if z == saved:
+                return max_iter
+            if n == next_save:
+                saved = z
+                next_save *= 2
     return n
 
-def display_mandelbrot(width, height, max_iter):
+def mandelbrot_grid(x, y, max_iter, shortcuts=True):
     """
-    Displays the Mandelbrot set using matplotlib.
+    Computes Mandelbrot iteration counts for a whole grid of points at once.
+    Only the points that have not escaped yet are iterated, so every pass gets cheaper.
+
+    Parameters:
+    x (np.array): Real coordinates of the grid columns.
+    y (np.array): Imaginary coordinates of the grid rows.
+    max_iter (int): The maximum number of iterations.
+    shortcuts (bool): Skip the iteration for points known to be inside the set, see mandelbrot().
+
+    Returns:
+    np.array: (len(y), len(x)) array of iteration counts, identical to calling mandelbrot() per point.
+    """
+    # Real and imaginary parts are iterated separately, with the same operations (and so
+    # the same rounding) as Python's complex multiplication and abs() in mandelbrot()
+    cr = np.broadcast_to(np.asarray(x, dtype=np.float64)[np.newaxis, :], (len(y), len(x))).ravel()
+    ci = np.broadcast_to(np.asarray(y, dtype=np.float64)[:, np.newaxis], (len(y), len(x))).ravel()
+
+    counts = np.full(cr.shape, max_iter, dtype=np.int64)
+    index = np.arange(cr.size) # Flat indices of the points still being iterated
+    if shortcuts:
+        outside = ~in_main_cardioid_or_bulb(cr, ci)
+        index, cr, ci = index[outside], cr[outside], ci[outside]
+    zr = np.zeros_like(cr)
+    zi = np.zeros_like(ci)
+    # Earlier orbit values, refreshed at every power of two (Brent)
+    saved_r = np.zeros_like(cr)
+    saved_i = np.zeros_like(ci)
+    next_save = 1
+
+    for n in range(max_iter):
+        if index.size == 0:
+            break
+        zr2 = zr * zr
+        zr2 -= zi * zi
+        zi *= zr
+        zi *= 2
+        zi += ci
+        zr = zr2
+        zr += cr
+        escaped = ~(np.hypot(zr, zi) <= 2)
+        # An exact repeat of a saved value means the orbit cycles forever, it keeps max_iter
+        finished = escaped | ((zr == saved_r) & (zi == saved_i)) if shortcuts else escaped
+        if finished.any():
+            counts[index[escaped]] = n + 1
+            keep = ~finished
+            index, zr, zi, cr, ci = index[keep], zr[keep], zi[keep], cr[keep], ci[keep]
+            if shortcuts:
+                saved_r, saved_i = saved_r[keep], saved_i[keep]
+        if shortcuts and n + 1 == next_save:
+            saved_r, saved_i = zr.copy(), zi.copy()
+            next_save *= 2
+
+    return counts.reshape(len(y), len(x))
+
+def compute_mandelbrot(x_range, y_range, width, height, max_iter, tiled=False, shortcuts=True):
+    """
+    Computes the Mandelbrot iteration-count image without plotting it.
 
     Parameters:
+    x_range (tuple): (x_min, x_max) of the real axis.
+    y_range (tuple): (y_min, y_max) of the imaginary axis.
     width (int): The width of the image in pixels.
     height (int): The height of the image in pixels.
-    max_iter (int): The maximum number of iterations for the Mandelbrot calculation.
-    """
-    image = np.zeros((height, width))
-    x_min, x_max = -2.0, 1.0
-    y_min, y_max = -1.5, 1.5
+    max_iter (int): The maximum number of iterations.
+    tiled (bool): Split the image into tiles and render them on all cores.
+    shortcuts (bool): Skip the iteration for points known to be inside the set, see mandelbrot().
 
+    Returns:
+    np.array: (height, width) array of iteration counts, with the first row at y_max.
+    """
+    x_min, x_max = x_range
+    y_min, y_max = y_range
     x = np.linspace(x_min, x_max, width)
     y = np.linspace(y_max, y_min, height) # y_max to y_min to orient the image correctly
+    if tiled:
+        return render_tiled(partial(mandelbrot_grid, shortcuts=shortcuts), x, y, max_iter)
+    return mandelbrot_grid(x, y, max_iter, shortcuts)
+
+def display_mandelbrot(width, height, max_iter, tiled=False, x_range=(-2.0, 1.0), y_range=(-1.5, 1.5)):
+    """
+    Displays the Mandelbrot set using matplotlib.
+    For zoom sequences and views beyond float64 precision, see deep_zoom.py.
+
+    Parameters:
+    width (int): The width of the image in pixels.
+    height (int): The height of the image in pixels.
+    max_iter (int): The maximum number of iterations for the Mandelbrot calculation.
+    tiled (bool): Render tiles of the image in parallel on all cores.
+    x_range (tuple): (x_min, x_max) of the real axis.
+    y_range (tuple): (y_min, y_max) of the imaginary axis.
+    """
+    x_min, x_max = x_range
+    y_min, y_max = y_range
 
-    for i in range(height):
-        for j in range(width):
-            c = complex(x[j], y[i])
-            iteration_count = mandelbrot(c, max_iter)
-            image[i, j] = iteration_count
+    image = compute_mandelbrot((x_min, x_max), (y_min, y_max), width, height, max_iter, tiled)
 
     plt.imshow(image, extent=[x_min, x_max, y_min, y_max], cmap='magma') # 'magma' colormap for visualization
     plt.title('Mandelbrot Set')
@@ -48,6 +168,18 @@ def display_mandelbrot(width, height, max_iter):
     plt.colorbar(label='Iteration Count') # Add a colorbar to show iteration count meaning
     plt.show()
 
+def draw(t):
+    """
+    Draws iteration-count contours of the Mandelbrot set, for the plotter (see gcode.py).
+
+    Parameters:
+    t (turtle.Turtle): The turtle to draw with, one grid pixel per turtle unit.
+    """
+    counts = compute_mandelbrot(DRAW_X_RANGE, DRAW_Y_RANGE, DRAW_WIDTH, DRAW_HEIGHT, DRAW_MAX_ITER)
+    polylines, _ = iteration_contours(counts, CONTOUR_ITERATIONS, CONTOUR_TOLERANCE)
+    for points in polylines:
+        draw_polyline(t, points)
+
 if __name__ == '__main__':
     image_width = 500
     image_height = 500
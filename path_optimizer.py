@@ -0,0 +1,213 @@
+# path_optimizer.py
+#
+# Description:
+#   Reorders (and optionally reverses) the strokes of a drawing to cut down the distance
+#   the plotter travels with the pen up. Strokes are chained with a nearest-neighbour
+#   search on a KD-tree of stroke endpoints, then the order is refined with 2-opt moves.
+#
+# Dependencies:
+#   - scipy (pip install scipy)
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from gcode_stats import DEFAULT_RAPID_RATE
+
+# Dwell per pen lift: G04 P0.5 + G04 P0.5 when lifting, G04 P0.5 + G04 P1 when lowering
+PEN_LIFT_DWELL = 2.5
+
+
+def stroke_endpoints(polylines):
+    """
+    Returns the start and end points of every stroke.
+
+    Args:
+        polylines (list): List of (N, 2) arrays (or lists of points).
+
+    Returns:
+        tuple: (starts, ends) - Two (len(polylines), 2) arrays.
+    """
+    starts = np.array([points[0] for points in polylines], dtype=float).reshape(-1, 2)
+    ends = np.array([points[-1] for points in polylines], dtype=float).reshape(-1, 2)
+    return starts, ends
+
+
+def travel_stats(starts, ends):
+    """
+    Measures the pen-up travel between consecutive strokes.
+
+    Args:
+        starts (np.array): (N, 2) start points, in drawing order.
+        ends (np.array): (N, 2) end points, in drawing order.
+
+    Returns:
+        tuple: (distance, lifts) - Total travel distance and number of pen lifts.
+    """
+    gaps = starts[1:] - ends[:-1]
+    lifts = int(np.count_nonzero(np.any(gaps != 0, axis=1)))
+    return float(np.hypot(gaps[:, 0], gaps[:, 1]).sum()), lifts
+
+
+def nearest_neighbour_order(starts, ends, reverse=True):
+    """
+    Chains strokes greedily, always drawing the unvisited stroke with the closest endpoint next.
+    The first stroke stays first.
+
+    Args:
+        starts (np.array): (N, 2) start points.
+        ends (np.array): (N, 2) end points.
+        reverse (bool): Allow strokes to be drawn from their end point.
+
+    Returns:
+        tuple: (order, flipped) - Stroke indices in drawing order, and which of them are reversed.
+    """
+    count = len(starts)
+    # Entry k < count starts stroke k at its start, entry k >= count starts it at its end
+    entries = np.vstack((starts, ends)) if reverse else starts
+    tree = cKDTree(entries)
+    visited = np.zeros(count, dtype=bool)
+
+    order = np.empty(count, dtype=np.int64)
+    flipped = np.zeros(count, dtype=bool)
+    order[0] = 0
+    visited[0] = True
+    position = ends[0]
+    for step in range(1, count):
+        k = 8
+        while True:
+            k = min(k, len(entries))
+            _, candidates = tree.query(position, k=k)
+            candidates = np.atleast_1d(candidates)
+            candidates = candidates[~visited[candidates % count]]
+            if candidates.size or k == len(entries):
+                break
+            k *= 4
+        entry = candidates[0]
+        stroke = entry % count
+        order[step] = stroke
+        flipped[step] = entry >= count
+        visited[stroke] = True
+        position = starts[stroke] if flipped[step] else ends[stroke]
+    return order, flipped
+
+
+def two_opt(starts, ends, neighbours=8, max_passes=50):
+    """
+    Improves a stroke order with 2-opt moves. Reversing a run of strokes also reverses
+    each of them, so only the two travel moves at the ends of the run change.
+
+    Candidate moves join each stroke's end to the ends of its nearest neighbours (found
+    with a KD-tree). Every pass evaluates all candidates at once and applies the best
+    improving moves that do not overlap.
+
+    Args:
+        starts (np.array): (N, 2) start points in drawing order, modified in place.
+        ends (np.array): (N, 2) end points in drawing order, modified in place.
+        neighbours (int): Number of nearest neighbours considered per stroke.
+        max_passes (int): Maximum number of passes.
+
+    Returns:
+        tuple: (order, flipped) - Permutation of the input positions, and which of them were reversed.
+    """
+    count = len(starts)
+    order = np.arange(count)
+    flipped = np.zeros(count, dtype=bool)
+    neighbours = min(neighbours + 1, count)
+
+    for _ in range(max_passes):
+        # Reversing the run first+1..last turns the travel moves (first -> first+1) and
+        # (last -> last+1) into (first -> last) and (first+1 -> last+1)
+        _, nearest = cKDTree(ends).query(ends, k=neighbours)
+        first = np.repeat(np.arange(count), neighbours)
+        last = nearest.ravel()
+        first, last = np.minimum(first, last), np.maximum(first, last)
+        valid = first < last
+        first, last = first[valid], last[valid]
+
+        has_after = last + 1 < count
+        after = np.minimum(last + 1, count - 1)
+        old = np.hypot(*(starts[first + 1] - ends[first]).T) \
+            + np.where(has_after, np.hypot(*(starts[after] - ends[last]).T), 0)
+        new = np.hypot(*(ends[last] - ends[first]).T) \
+            + np.where(has_after, np.hypot(*(starts[after] - starts[first + 1]).T), 0)
+        gain = old - new
+
+        improving = np.flatnonzero(gain > 1e-9)
+        if improving.size == 0:
+            break
+        improving = improving[np.argsort(-gain[improving])]
+
+        # Apply the best moves whose runs (and bordering travel moves) do not overlap
+        touched = np.zeros(count + 1, dtype=bool)
+        for move in improving.tolist():
+            i, j = first[move], last[move]
+            if touched[i:j + 2].any():
+                continue
+            touched[i:j + 2] = True
+            run = slice(i + 1, j + 1)
+            starts[run], ends[run] = ends[run][::-1].copy(), starts[run][::-1].copy()
+            order[run] = order[run][::-1].copy()
+            flipped[run] = ~flipped[run][::-1]
+    return order, flipped
+
+
+def optimize_path(polylines, reverse=True, refine=True):
+    """
+    Reorders strokes to minimize the pen-up travel distance.
+
+    Args:
+        polylines (list): List of (N, 2) arrays (or lists of points), in drawing order.
+        reverse (bool): Allow strokes to be drawn backwards.
+        refine (bool): Refine the nearest-neighbour order with 2-opt (requires reverse).
+
+    Returns:
+        tuple: (polylines, report) - The reordered polylines, and a dict with the travel
+        distance and pen lifts before and after.
+    """
+    if len(polylines) < 2:
+        return list(polylines), None
+
+    starts, ends = stroke_endpoints(polylines)
+    travel_before, lifts_before = travel_stats(starts, ends)
+
+    order, flipped = nearest_neighbour_order(starts, ends, reverse)
+    ordered_starts = np.where(flipped[:, np.newaxis], ends[order], starts[order])
+    ordered_ends = np.where(flipped[:, np.newaxis], starts[order], ends[order])
+    if refine and reverse:
+        positions, reversed_again = two_opt(ordered_starts, ordered_ends)
+        order = order[positions]
+        flipped = flipped[positions] ^ reversed_again
+
+    result = []
+    for stroke, backwards in zip(order.tolist(), flipped.tolist()):
+        points = np.asarray(polylines[stroke], dtype=float)
+        result.append(points[::-1] if backwards else points)
+
+    travel_after, lifts_after = travel_stats(*stroke_endpoints(result))
+    report = {
+        'strokes': len(polylines),
+        'travel_before': travel_before,
+        'travel_after': travel_after,
+        'lifts_before': lifts_before,
+        'lifts_after': lifts_after,
+    }
+    return result, report
+
+
+def estimate_time_saved(report, scale=1.0, rapid_rate=DEFAULT_RAPID_RATE, lift_dwell=PEN_LIFT_DWELL):
+    """
+    Estimates how much plotting time a reordering saves.
+
+    Args:
+        report (dict): Report returned by optimize_path.
+        scale (float): Machine units (mm) per drawing unit.
+        rapid_rate (float): Speed of travel (G0) moves in mm per minute. They ignore the
+            feed rate, the default is the one gcode_stats.py assumes.
+        lift_dwell (float): Seconds of dwell per pen lift.
+
+    Returns:
+        tuple: (distance, seconds) - Travel saved in mm and the estimated time saved.
+    """
+    distance = (report['travel_before'] - report['travel_after']) * scale
+    seconds = distance / rapid_rate * 60 + (report['lifts_before'] - report['lifts_after']) * lift_dwell
+    return distance, seconds
@@ -1,5 +1,19 @@
 import matplotlib.pyplot as plt
 import numpy as np
+from contours import iteration_contours
+from recording_turtle import draw_polyline
+from tiled_render import render_tiled
+
+# --- Plotter drawing (draw) ---
+# View, grid size and iteration limit of the image whose contours are drawn
+DRAW_X_RANGE = (1.0, 2.0)
+DRAW_Y_RANGE = (-0.5, 0.5)
+DRAW_WIDTH, DRAW_HEIGHT = 600, 600
+DRAW_MAX_ITER = 100
+# Outlines of the points that take at least this many iterations to escape
+CONTOUR_ITERATIONS = [5, 6, 7, 8, 10, 12, 16, 100]
+# How far (in grid pixels) the simplified contours may deviate from the traced ones
+CONTOUR_TOLERANCE = 0.25
 
 def trigonometric_fractal(c, max_iter):
     """
@@ -19,7 +33,74 @@ def trigonometric_fractal(c, max_iter):
         n += 1
     return n
 
-def display_trigonometric_fractal(width, height, max_iter):
+def trigonometric_fractal_grid(x, y, max_iter):
+    """
+    Computes Trigonometric Fractal iteration counts for a whole grid of points at once.
+    cos(c) is computed once for the grid, the iteration runs in place in preallocated
+    buffers, and only the points that have not escaped yet are iterated.
+
+    Parameters:
+    x (np.array): Real coordinates of the grid columns.
+    y (np.array): Imaginary coordinates of the grid rows.
+    max_iter (int): Maximum iterations.
+
+    Returns:
+    np.array: (len(y), len(x)) array of iteration counts, identical to calling trigonometric_fractal() per point.
+    """
+    c = np.empty((len(y), len(x)), dtype=np.complex128)
+    c.real = x[np.newaxis, :]
+    c.imag = y[:, np.newaxis]
+    cos_c = np.cos(c.ravel()) # Constant for each point, so computed only once
+
+    counts = np.full(cos_c.shape, max_iter, dtype=np.int64)
+    index = np.arange(cos_c.size) # Flat indices of the points still being iterated
+    z = np.zeros_like(cos_c)
+    magnitude = np.empty(cos_c.shape, dtype=np.float64)
+    escaped = np.empty(cos_c.shape, dtype=bool)
+
+    # Escaping orbits grow without bound, overflowing to inf/nan is expected
+    with np.errstate(over='ignore', invalid='ignore'):
+        for n in range(max_iter):
+            if index.size == 0:
+                break
+            np.sin(z, out=z)
+            z += cos_c
+            np.abs(z, out=magnitude)
+            np.less_equal(magnitude, 2, out=escaped)
+            np.logical_not(escaped, out=escaped)
+            if escaped.any():
+                counts[index[escaped]] = n + 1
+                keep = ~escaped
+                index, z, cos_c = index[keep], z[keep], cos_c[keep]
+                magnitude = magnitude[:index.size]
+                escaped = escaped[:index.size]
+
+    return counts.reshape(len(y), len(x))
+
+def compute_trigonometric_fractal(x_range, y_range, width, height, max_iter, tiled=False):
+    """
+    Computes the Trigonometric Fractal iteration-count image without plotting it.
+
+    Parameters:
+    x_range (tuple): (x_min, x_max) of the real axis.
+    y_range (tuple): (y_min, y_max) of the imaginary axis.
+    width (int): Image width.
+    height (int): Image height.
+    max_iter (int): Maximum iterations.
+    tiled (bool): Split the image into tiles and render them on all cores.
+
+    Returns:
+    np.array: (height, width) array of iteration counts, with the first row at y_max.
+    """
+    x_min, x_max = x_range
+    y_min, y_max = y_range
+    x = np.linspace(x_min, x_max, width)
+    y = np.linspace(y_max, y_min, height)
+    if tiled:
+        return render_tiled(trigonometric_fractal_grid, x, y, max_iter)
+    return trigonometric_fractal_grid(x, y, max_iter)
+
+def display_trigonometric_fractal(width, height, max_iter, tiled=False):
     """
     Displays the Trigonometric Fractal using matplotlib, zoomed in to the specified range.
 
@@ -27,19 +108,12 @@ def display_trigonometric_fractal(width, height, max_iter):
     width (int): Image width.
     height (int): Image height.
     max_iter (int): Maximum iterations.
+    tiled (bool): Render tiles of the image in parallel on all cores.
     """
-    image = np.zeros((height, width))
     x_min, x_max = 1.0, 2.0  # Zoomed in Real axis range
     y_min, y_max = -0.5, 0.5  # Zoomed in Imaginary axis range
 
-    x = np.linspace(x_min, x_max, width)
-    y = np.linspace(y_max, y_min, height)
-
-    for i in range(height):
-        for j in range(width):
-            c = complex(x[j], y[i])
-            iteration_count = trigonometric_fractal(c, max_iter)
-            image[i, j] = iteration_count
+    image = compute_trigonometric_fractal((x_min, x_max), (y_min, y_max), width, height, max_iter, tiled)
 
     plt.figure(figsize=(8, 8))
     plt.imshow(image, extent=[x_min, x_max, y_min, y_max], cmap='viridis')
@@ -49,6 +123,18 @@ def display_trigonometric_fractal(width, height, max_iter):
     plt.colorbar(label='Iteration Count')
     plt.show()
 
+def draw(t):
+    """
+    Draws iteration-count contours of the Trigonometric Fractal, for the plotter (see gcode.py).
+
+    Parameters:
+    t (turtle.Turtle): The turtle to draw with, one grid pixel per turtle unit.
+    """
+    image = compute_trigonometric_fractal(DRAW_X_RANGE, DRAW_Y_RANGE, DRAW_WIDTH, DRAW_HEIGHT, DRAW_MAX_ITER)
+    polylines, _ = iteration_contours(image, CONTOUR_ITERATIONS, CONTOUR_TOLERANCE)
+    for points in polylines:
+        draw_polyline(t, points)
+
 if __name__ == '__main__':
     image_width = 500
     image_height = 500
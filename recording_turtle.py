@@ -0,0 +1,336 @@
+# recording_turtle.py
+#
+# Description:
+#   A headless stand-in for the turtle graphics API used by the drawing scripts.
+#   Instead of creating canvas items, the turtle records every pen-down move as
+#   polylines ("strokes") that can be turned into G-Code without ever touching Tk.
+#
+# Usage:
+#   from recording_turtle import RecordingTurtle
+#   t = RecordingTurtle()
+#   draw(t)
+#   gcode_writer.write_gcode(sys.stdout, t.strokes, 410, 300)
+
+import math
+
+import numpy as np
+from gcode_writer import Arc, compute_scale, first_move, iter_moves
+
+# Default window size, matching the t.setup(800, 800) call in gcode.py
+DEFAULT_WINDOW_WIDTH = 800
+DEFAULT_WINDOW_HEIGHT = 800
+
+
+def _direction(heading):
+    """
+    Returns the unit vector for a heading in degrees.
+    Multiples of 90 degrees are returned exactly so grid-aligned drawings stay on the grid.
+
+    Args:
+        heading (float): The heading in degrees (0 is east, counter-clockwise is positive).
+
+    Returns:
+        tuple: (dx, dy) - The unit direction vector.
+    """
+    quarter, remainder = divmod(heading, 90)
+    if remainder == 0:
+        return ((1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0))[int(quarter) % 4]
+    angle = math.radians(heading)
+    return math.cos(angle), math.sin(angle)
+
+
+def draw_polyline(t, points):
+    """
+    Draws a polyline with any turtle. A RecordingTurtle stores the whole array as one
+    stroke, other turtles are driven through goto() point by point.
+
+    Args:
+        t (turtle.Turtle): The turtle to draw with.
+        points (array-like): (N, 2) array of points, the pen is lifted to reach the first one.
+    """
+    if hasattr(t, 'add_polyline'):
+        t.add_polyline(points)
+        return
+    points = np.asarray(points, dtype=float).tolist()
+    t.penup()
+    t.goto(*points[0])
+    t.pendown()
+    for x, y in points[1:]:
+        t.goto(x, y)
+
+
+class RecordingScreen:
+    """
+    The minimal part of the turtle Screen API the drawing scripts rely on.
+    All display related calls are accepted and ignored.
+    """
+
+    def __init__(self, width=DEFAULT_WINDOW_WIDTH, height=DEFAULT_WINDOW_HEIGHT):
+        self._width = width
+        self._height = height
+
+    def setup(self, width=DEFAULT_WINDOW_WIDTH, height=DEFAULT_WINDOW_HEIGHT, startx=None, starty=None):
+        self._width = width
+        self._height = height
+
+    def window_width(self):
+        return self._width
+
+    def window_height(self):
+        return self._height
+
+    # --- Display calls that have nothing to do when recording ---
+    def tracer(self, n=None, delay=None):
+        pass
+
+    def update(self):
+        pass
+
+    def title(self, titlestring):
+        pass
+
+    def bgcolor(self, *args):
+        pass
+
+    def delay(self, delay=None):
+        pass
+
+    def exitonclick(self):
+        pass
+
+    def mainloop(self):
+        pass
+
+    done = mainloop
+
+
+class RecordingTurtle:
+    """
+    A turtle that only records geometry.
+
+    Pen-down moves are appended to `strokes`, a list of polylines where each polyline
+    is a list of (x, y) tuples, or an (N, 2) NumPy array when added with add_polyline().
+    A new stroke is started whenever the pen has to be lifted to reach the start of the
+    next move.
+
+    Like turtle_gcode, circles drawn without `steps` are true arcs: they get a stroke of
+    their own, holding the polygon the turtle would draw on screen, and `arcs` maps the
+    index of that stroke to its Arc. The G-Code writer sends these strokes as G2/G3 moves.
+    Steps that rebuild the strokes (thinning, simplification, travel optimization) only
+    see the polygons.
+    """
+
+    def __init__(self, screen=None):
+        self.screen = screen if screen is not None else RecordingScreen()
+        self.strokes = []
+        self.arcs = {}
+        self._x = 0.0
+        self._y = 0.0
+        self._heading = 0.0
+        self._drawing = True
+        self._stroke = None
+
+    # --- Recording ---
+    def _move_to(self, x, y):
+        """Moves the turtle, recording the move if the pen is down."""
+        start = (self._x, self._y)
+        end = (float(x), float(y))
+        if self._drawing:
+            if self._stroke is not None and self._stroke[-1] == start:
+                self._stroke.append(end)
+            else:
+                self._stroke = [start, end]
+                self.strokes.append(self._stroke)
+        self._x, self._y = end
+
+    # --- Movement ---
+    def forward(self, distance):
+        dx, dy = _direction(self._heading)
+        self._move_to(self._x + distance * dx, self._y + distance * dy)
+
+    def backward(self, distance):
+        self.forward(-distance)
+
+    def left(self, angle):
+        self._heading = (self._heading + angle) % 360.0
+
+    def right(self, angle):
+        self.left(-angle)
+
+    def goto(self, x, y=None):
+        if y is None:
+            x, y = x
+        self._move_to(x, y)
+
+    def setx(self, x):
+        self._move_to(x, self._y)
+
+    def sety(self, y):
+        self._move_to(self._x, y)
+
+    def setheading(self, to_angle):
+        self._heading = to_angle % 360.0
+
+    def home(self):
+        self._move_to(0.0, 0.0)
+        self._heading = 0.0
+
+    def circle(self, radius, extent=None, steps=None):
+        """
+        Draws a circle (or arc) as a regular polygon, following the exact
+        step rules of turtle.Turtle.circle. Without steps it is also recorded as
+        a true arc, see the class description.
+        """
+        if extent is None:
+            extent = 360.0
+        if steps is None and radius != 0 and self._drawing:
+            # The centre is a quarter turn to the left of the heading, as in turtle_gcode
+            angle = math.radians(self._heading) + math.pi / 2
+            centre = (self._x + radius * math.cos(angle), self._y + radius * math.sin(angle))
+            self._stroke = None
+            start = len(self.strokes)
+            self._polygon(radius, extent, None)
+            if len(self.strokes) == start + 1:
+                self.arcs[start] = Arc(centre, radius, extent)
+            self._stroke = None
+            return
+        self._polygon(radius, extent, steps)
+
+    def _polygon(self, radius, extent, steps):
+        """Draws the regular polygon of turtle.Turtle.circle."""
+        if steps is None:
+            frac = abs(extent) / 360.0
+            steps = 1 + int(min(11 + abs(radius) / 6.0, 59.0) * frac)
+        w = 1.0 * extent / steps
+        w2 = 0.5 * w
+        length = 2.0 * radius * math.sin(math.radians(w2))
+        if radius < 0:
+            length, w, w2 = -length, -w, -w2
+        self.left(w2)
+        for _ in range(steps):
+            self.forward(length)
+            self.left(w)
+        self.left(-w2)
+
+    def add_polyline(self, points):
+        """
+        Records a whole polyline at once, as if the turtle lifted the pen, went to the
+        first point and then visited every other point with the pen down.
+
+        Args:
+            points (array-like): (N, 2) array of points.
+        """
+        points = np.asarray(points, dtype=float)
+        self.strokes.append(points)
+        self._stroke = None
+        self._x, self._y = float(points[-1, 0]), float(points[-1, 1])
+        self._drawing = True
+
+    def dot(self, size=None, *color):
+        # Like turtle_gcode, a dot becomes a move with zero length
+        self._move_to(self._x, self._y)
+
+    # --- Pen control ---
+    def penup(self):
+        self._drawing = False
+
+    def pendown(self):
+        self._drawing = True
+
+    def isdown(self):
+        return self._drawing
+
+    # --- State ---
+    def position(self):
+        return self._x, self._y
+
+    def xcor(self):
+        return self._x
+
+    def ycor(self):
+        return self._y
+
+    def heading(self):
+        return self._heading
+
+    def getscreen(self):
+        return self.screen
+
+    def window_width(self):
+        return self.screen.window_width()
+
+    def window_height(self):
+        return self.screen.window_height()
+
+    # --- Appearance calls that have nothing to do when recording ---
+    def speed(self, speed=None):
+        pass
+
+    def hideturtle(self):
+        pass
+
+    def showturtle(self):
+        pass
+
+    def pensize(self, width=None):
+        pass
+
+    def color(self, *args):
+        pass
+
+    def pencolor(self, *args):
+        pass
+
+    def fillcolor(self, *args):
+        pass
+
+    def begin_fill(self):
+        pass
+
+    def end_fill(self):
+        pass
+
+    def tracer(self, n=None, delay=None):
+        pass
+
+    def update(self):
+        pass
+
+    # --- turtle module aliases ---
+    fd = forward
+    bk = back = backward
+    lt = left
+    rt = right
+    setpos = setposition = goto
+    seth = setheading
+    pu = up = penup
+    pd = down = pendown
+    pos = position
+    ht = hideturtle
+    st = showturtle
+    width = pensize
+
+    # --- G-Code output ---
+    def write_gcode(self, width, height, x=0, y=0, allow_rotation=False, penup_command=None, pendown_command=None):
+        """
+        Writes the recorded strokes as G-Code, scaled to fit the printable area.
+        The output matches turtle_gcode.write_gcode for drawings made of straight moves and circles.
+        Use gcode_writer.write_gcode to stream large drawings instead of building a string.
+
+        Args:
+            width (float): The width of the printable area.
+            height (float): The height of the printable area.
+            x (float): The x coordinate of the bottom left corner of the printable area.
+            y (float): The y coordinate of the bottom left corner of the printable area.
+            allow_rotation (bool): Rotate the drawing by 90 degrees if that lets it be drawn bigger.
+            penup_command (str): G-Code sent before each travel move, or None.
+            pendown_command (str): G-Code sent after each travel move, or None.
+
+        Returns:
+            str: The generated G-Code.
+        """
+        info = compute_scale(self.strokes, width, height, x, y, allow_rotation, self.arcs)
+        if info is None:
+            return ''
+        moves = "".join(iter_moves(self.strokes, info, penup_command, pendown_command, arcs=self.arcs))
+        return (first_move(self.strokes, info) + "\n" + moves).removesuffix("\n")
@@ -0,0 +1,294 @@
+# simplify.py
+#
+# Description:
+#   Shrinks a drawing before it is turned into G-Code, without changing how it looks
+#   within a given tolerance: duplicate segments are dropped, strokes that meet end to
+#   end are joined, and each polyline loses duplicate, collinear and redundant points
+#   (Ramer-Douglas-Peucker).
+
+from collections import defaultdict
+
+import numpy as np
+
+# Tolerance used to recognise exactly collinear or coincident points
+EPSILON = 1e-9
+# Grid (in drawing units) that segment endpoints are snapped to when looking for retraces
+SNAP = 1e-6
+
+
+def remove_duplicate_points(points):
+    """
+    Drops points that repeat the point before them.
+
+    Args:
+        points (np.array): (N, 2) array of points.
+
+    Returns:
+        np.array: The remaining points, always including the first one.
+    """
+    if len(points) < 2:
+        return points
+    step = np.hypot(*np.diff(points, axis=0).T)
+    return points[np.concatenate(([True], step > EPSILON))]
+
+
+def remove_collinear_points(points):
+    """
+    Drops points that lie on the straight line between their neighbours, heading the same way.
+    Only (numerically) exact collinearity is removed, so runs of such points can go in one pass.
+
+    Args:
+        points (np.array): (N, 2) array of points.
+
+    Returns:
+        np.array: The remaining points.
+    """
+    if len(points) < 3:
+        return points
+    incoming = points[1:-1] - points[:-2]
+    outgoing = points[2:] - points[1:-1]
+    cross = incoming[:, 0] * outgoing[:, 1] - incoming[:, 1] * outgoing[:, 0]
+    dot = (incoming * outgoing).sum(axis=1)
+    scale = np.hypot(*incoming.T) * np.hypot(*outgoing.T)
+    straight = (np.abs(cross) <= EPSILON * np.maximum(scale, 1.0)) & (dot > 0)
+    return points[np.concatenate(([True], ~straight, [True]))]
+
+
+def rdp(points, tolerance):
+    """
+    Simplifies a polyline with the Ramer-Douglas-Peucker algorithm.
+
+    Args:
+        points (np.array): (N, 2) array of points.
+        tolerance (float): Maximum distance between the original and the simplified polyline.
+
+    Returns:
+        np.array: The remaining points.
+    """
+    if len(points) < 3 or tolerance <= 0:
+        return points
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        inner = points[first + 1:last]
+        direction = end - start
+        length = np.hypot(*direction)
+        if length > 0:
+            distance = np.abs(direction[0] * (inner[:, 1] - start[1]) - direction[1] * (inner[:, 0] - start[0])) / length
+        else:
+            distance = np.hypot(*(inner - start).T)
+        farthest = np.argmax(distance)
+        if distance[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return points[keep]
+
+
+def remove_duplicate_segments(polylines):
+    """
+    Drops segments that were already drawn, in either direction. Only retraced runs at the
+    start or end of a stroke are trimmed (and fully retraced strokes dropped): a retrace in
+    the middle of a stroke is cheaper to draw than a pen lift to skip it.
+
+    Args:
+        polylines (list): List of (N, 2) arrays.
+
+    Returns:
+        list: The remaining polylines.
+    """
+    polylines = [points for points in polylines if len(points) >= 2]
+    if not polylines:
+        return []
+    starts = np.concatenate([points[:-1] for points in polylines])
+    ends = np.concatenate([points[1:] for points in polylines])
+
+    # Undirected segment keys: both snapped endpoints, smaller one first
+    a = np.rint(starts / SNAP).astype(np.int64)
+    b = np.rint(ends / SNAP).astype(np.int64)
+    swap = (a[:, 0] > b[:, 0]) | ((a[:, 0] == b[:, 0]) & (a[:, 1] > b[:, 1]))
+    keys = np.where(swap[:, np.newaxis], np.hstack((b, a)), np.hstack((a, b)))
+    _, first = np.unique(keys, axis=0, return_index=True)
+    keep = np.zeros(len(keys), dtype=bool)
+    keep[first] = True
+
+    result = []
+    offset = 0
+    for points in polylines:
+        kept = np.flatnonzero(keep[offset:offset + len(points) - 1])
+        offset += len(points) - 1
+        if kept.size:
+            result.append(points[kept[0]:kept[-1] + 2])
+    return result
+
+
+def join_strokes(polylines, tolerance=0.0):
+    """
+    Joins strokes whose endpoints coincide, reversing them where needed, so the pen does
+    not have to be lifted between them.
+
+    Args:
+        polylines (list): List of (N, 2) arrays.
+        tolerance (float): Endpoints are matched on a grid of this size.
+
+    Returns:
+        list: The joined polylines.
+    """
+    grid = max(tolerance, EPSILON)
+
+    def node(point):
+        return tuple(np.rint(point / grid).astype(np.int64).tolist())
+
+    # Endpoint node -> strokes that start (end 0) or finish (end 1) there
+    endpoints = defaultdict(list)
+    for index, points in enumerate(polylines):
+        endpoints[node(points[0])].append((index, 0))
+        endpoints[node(points[-1])].append((index, 1))
+
+    used = [False] * len(polylines)
+
+    def next_stroke(at):
+        for index, end in endpoints[at]:
+            if not used[index]:
+                used[index] = True
+                return polylines[index] if end == 0 else polylines[index][::-1]
+        return None
+
+    result = []
+    for index, points in enumerate(polylines):
+        if used[index]:
+            continue
+        used[index] = True
+        chain = [points]
+        # Extend forwards from the end, then backwards from the start
+        while (following := next_stroke(node(chain[-1][-1]))) is not None:
+            chain.append(following[1:])
+        while (preceding := next_stroke(node(chain[0][0]))) is not None:
+            chain.insert(0, preceding[::-1][:-1])
+        result.append(np.concatenate(chain) if len(chain) > 1 else points)
+    return result
+
+
+def simplify_drawing(polylines, tolerance):
+    """
+    Runs all simplification steps on a drawing.
+
+    Args:
+        polylines (list): List of (N, 2) arrays (or lists of points).
+        tolerance (float): Maximum deviation allowed, in drawing units.
+
+    Returns:
+        tuple: (polylines, report) - The simplified polylines, and a dict with point and
+        stroke counts before and after.
+    """
+    polylines = [np.asarray(points, dtype=float) for points in polylines]
+    report = {
+        'points_before': sum(len(points) for points in polylines),
+        'strokes_before': len(polylines),
+    }
+
+    polylines = remove_duplicate_segments(polylines)
+    polylines = join_strokes(polylines, tolerance)
+    simplified = []
+    for points in polylines:
+        points = remove_duplicate_points(points)
+        points = remove_collinear_points(points)
+        simplified.append(rdp(points, tolerance))
+
+    report['points_after'] = sum(len(points) for points in simplified)
+    report['strokes_after'] = len(simplified)
+    return simplified, report
+
+
+def thin_by_density(polylines, pen_width, min_skip=None):
+    """
+    Drops moves that add no ink. The drawing is rasterized onto an occupancy grid with
+    cells one pen width wide: every segment is sampled at least once per pen width, and
+    a segment is "inked" when all the cells it passes through were inked by earlier ones.
+
+    - While a polyline stays inside one cell, only the first point of the run is kept.
+    - Where a polyline runs over inked segments for at least min_skip, the run is cut
+      out and the pen is lifted over it instead.
+
+    Args:
+        polylines (list): List of (N, 2) arrays (or lists of points).
+        pen_width (float): Width of the pen, in drawing units.
+        min_skip (float): Shortest stretch of already inked path worth a pen lift,
+            in drawing units (default: 100 pen widths).
+
+    Returns:
+        tuple: (polylines, report) - The thinned polylines, and a dict with the points
+        and strokes before and after, and the number of inked cells.
+    """
+    if min_skip is None:
+        min_skip = 100 * pen_width
+    polylines = [np.asarray(points, dtype=float) for points in polylines if len(points)]
+    report = {'points_before': sum(len(points) for points in polylines), 'strokes_before': len(polylines)}
+    if not polylines:
+        report.update(points_after=0, strokes_after=0, cells=0)
+        return [], report
+    lengths = np.array([len(points) for points in polylines])
+    points = np.concatenate(polylines)
+    count = len(points)
+    starts = np.cumsum(lengths) - lengths
+    ends = np.cumsum(lengths) - 1
+
+    # Segment i runs from point i - 1 to point i, the first point of a polyline is a dot
+    step = np.zeros(count)
+    step[1:] = np.hypot(*np.diff(points, axis=0).T)
+    step[starts] = 0
+    distance = np.cumsum(step)
+
+    # Sample every segment at least once per pen width, ending on its last point
+    samples_per_segment = np.maximum(1, np.ceil(step / pen_width)).astype(np.int64)
+    first_sample = np.cumsum(samples_per_segment) - samples_per_segment
+    owner = np.repeat(np.arange(count), samples_per_segment)
+    remaining = np.repeat(first_sample + samples_per_segment, samples_per_segment) - np.arange(len(owner)) - 1
+    previous = points[np.maximum(owner - 1, 0)]
+    samples = points[owner] - (points[owner] - previous) * (remaining / samples_per_segment[owner])[:, None]
+
+    # One integer per grid cell, so the occupancy lookup is a 1D unique
+    cells = np.floor((samples - samples.min(axis=0)) / pen_width).astype(np.int64)
+    sample_keys = cells[:, 0] * (int(cells[:, 1].max()) + 1) + cells[:, 1]
+    unique_keys, first_visit = np.unique(sample_keys, return_index=True)
+    inked_before = owner[first_visit[np.searchsorted(unique_keys, sample_keys)]] < owner
+    inked = np.logical_and.reduceat(inked_before, first_sample)
+    keys = sample_keys[first_sample + samples_per_segment - 1]
+    # The first and last segment of a polyline are always drawn
+    inked[starts] = False
+    inked[np.minimum(starts + 1, ends)] = False
+    inked[ends] = False
+
+    # Runs of inked segments, measured along the path from the point before the first
+    edges = np.diff(np.concatenate(([False], inked, [False])).astype(np.int8))
+    run_first = np.flatnonzero(edges == 1) - 1
+    run_last = np.flatnonzero(edges == -1) - 1
+    long_run = distance[run_last] - distance[run_first] >= min_skip
+    run_first, run_last = run_first[long_run], run_last[long_run]
+
+    # Drop the inside of long runs, and every point that stays in its predecessor's cell
+    inside = np.zeros(count + 1, dtype=np.int64)
+    np.add.at(inside, run_first + 1, 1)
+    np.add.at(inside, run_last, -1)
+    keep = np.ones(count, dtype=bool)
+    keep[1:] = keys[1:] != keys[:-1]
+    keep &= np.cumsum(inside[:-1]) == 0
+    keep[starts] = keep[ends] = True
+    keep[run_first] = keep[run_last] = True
+
+    # A new stroke starts at every polyline start and after every cut out run
+    piece_start = np.zeros(count, dtype=bool)
+    piece_start[starts] = True
+    piece_start[run_last] = True
+    piece = np.cumsum(piece_start)[keep]
+    kept = points[keep]
+    thinned = np.split(kept, np.flatnonzero(np.diff(piece)) + 1)
+
+    report.update(points_after=len(kept), strokes_after=len(thinned), cells=len(unique_keys))
+    return thinned, report
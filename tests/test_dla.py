@@ -0,0 +1,38 @@
+import random
+
+import numpy as np
+
+import dla
+
+
+def core_fill(grid, radius):
+    """Fraction of the cells within radius of the seed that belong to the cluster."""
+    center = grid.shape[0] // 2
+    rows, cols = np.indices(grid.shape)
+    return grid[np.hypot(cols - center, rows - center) < radius].mean()
+
+
+def mass_dimension(grid):
+    """Slope of log(mass) against log(radius) inside the cluster."""
+    radii = np.array([8, 12, 16, 24, 32, 45])
+    center = grid.shape[0] // 2
+    rows, cols = np.indices(grid.shape)
+    distance = np.hypot(cols - center, rows - center)
+    mass = [grid[distance < r].sum() for r in radii]
+    return np.polyfit(np.log(radii), np.log(mass), 1)[0]
+
+
+def test_batched_cluster_matches_fast_engine():
+    random.seed(1)
+    fast = dla.run_fast_dla_simulation(200, 3000, display=False)
+    batched = dla.run_batched_dla_simulation(200, 3000, seed=1, display=False)
+
+    for radius in (15, 30, 45):
+        assert abs(core_fill(batched, radius) - core_fill(fast, radius)) < 0.08
+    assert abs(mass_dimension(batched) - mass_dimension(fast)) < 0.15
+    assert 1.5 < mass_dimension(batched) < 1.85
+
+
+def test_batched_walker_count_follows_launch_circle():
+    assert dla.walker_count(0) == 1
+    assert dla.walker_count(100) > dla.walker_count(10)
@@ -0,0 +1,63 @@
+import io
+import os
+
+import gcode_cache
+
+
+def write_entry(cache_dir, key, transcript, gcode):
+    entry = gcode_cache.open_entry(cache_dir, transcript)
+    with entry:
+        entry.write(gcode)
+    return gcode_cache.commit_entry(cache_dir, key, entry.name)
+
+
+def test_entry_keeps_transcript_and_gcode(tmp_path):
+    gcode = "G04 P0.5\n\rM03\n\rG04 P0.5\nG0 X1 Y2\n"
+    transcript = [("stdout", "hello\n"), ("stderr", "Simplified: 9 -> 8 points\n")]
+    write_entry(str(tmp_path), "key", transcript, gcode)
+
+    read, entry = gcode_cache.read_entry(gcode_cache.lookup(str(tmp_path), "key"))
+    output = io.StringIO(newline='')
+    with entry:
+        gcode_cache.copy_entry(entry, output)
+    assert [tuple(item) for item in read] == transcript
+    assert output.getvalue() == gcode
+
+
+def test_entry_evicted_after_lookup_is_a_miss(tmp_path):
+    write_entry(str(tmp_path), "key", [], "G0 X0 Y0\n")
+    path = gcode_cache.lookup(str(tmp_path), "key")
+    gcode_cache.evict(str(tmp_path), 0)
+    assert gcode_cache.read_entry(path) is None
+
+
+def test_eviction_skips_entries_that_cannot_be_removed(tmp_path, monkeypatch):
+    busy = write_entry(str(tmp_path), "busy", [], "G0 X0 Y0\n")
+    write_entry(str(tmp_path), "free", [], "G0 X1 Y1\n")
+    remove = os.remove
+
+    def locked_remove(path):
+        if path == busy:
+            raise PermissionError(path)
+        remove(path)
+
+    monkeypatch.setattr(os, "remove", locked_remove)
+    gcode_cache.evict(str(tmp_path), 0)
+    assert os.listdir(tmp_path) == ["busy.gcode"]
+
+
+def test_failed_publish_keeps_existing_entry(tmp_path, monkeypatch):
+    path = write_entry(str(tmp_path), "key", [("stdout", "old\n")], "G0 X0 Y0\n")
+    entry = gcode_cache.open_entry(str(tmp_path), [("stdout", "new\n")])
+    with entry:
+        entry.write("G0 X0 Y0\n")
+
+    def locked_replace(source, target):
+        raise PermissionError(target)
+
+    monkeypatch.setattr(os, "replace", locked_replace)
+    assert gcode_cache.commit_entry(str(tmp_path), "key", entry.name) == path
+    assert os.listdir(tmp_path) == ["key.gcode"]
+    transcript, gcode = gcode_cache.read_entry(path)
+    with gcode:
+        assert transcript == [["stdout", "old\n"]]
@@ -0,0 +1,25 @@
+import pytest
+
+from gcode_stats import analyze_gcode
+
+
+def test_bare_coordinates_continue_the_last_motion_mode():
+    stats = analyze_gcode(["G0 X10 Y0", "X20", "G1 X20 Y10", "X30 Y10", "Y20"])
+
+    assert stats['travel_moves'] == 2
+    assert stats['travel_distance'] == pytest.approx(20)
+    assert stats['draw_moves'] == 3
+    assert stats['draw_distance'] == pytest.approx(30)
+
+
+def test_coordinates_before_any_motion_command_are_not_moves():
+    stats = analyze_gcode(["X10 Y10", "G1 X0 Y0"])
+
+    assert stats['draw_moves'] == 1
+    assert stats['draw_distance'] == pytest.approx(0)
+
+
+def test_commands_with_their_own_axis_words_are_not_moves():
+    stats = analyze_gcode(["G1 X10", "G92 X0", "G28 X0 Y0", "X20"])
+
+    assert stats['draw_moves'] == 2
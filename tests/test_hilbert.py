@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from hilbert import hilbert_points
+from recording_turtle import RecordingTurtle
+
+
+def hilbert_a(level, step, t):
+    """Reference turtle recursion, '|_|' orientation."""
+    if level == 0:
+        return
+    t.left(90)
+    hilbert_b(level - 1, step, t)
+    t.forward(step)
+    t.right(90)
+    hilbert_a(level - 1, step, t)
+    t.forward(step)
+    hilbert_a(level - 1, step, t)
+    t.right(90)
+    t.forward(step)
+    hilbert_b(level - 1, step, t)
+    t.left(90)
+
+
+def hilbert_b(level, step, t):
+    """Reference turtle recursion, '|-|' orientation."""
+    if level == 0:
+        return
+    t.right(90)
+    hilbert_a(level - 1, step, t)
+    t.forward(step)
+    t.left(90)
+    hilbert_b(level - 1, step, t)
+    t.forward(step)
+    hilbert_b(level - 1, step, t)
+    t.left(90)
+    t.forward(step)
+    hilbert_a(level - 1, step, t)
+    t.right(90)
+
+
+@pytest.mark.parametrize("level", [1, 2, 3, 5])
+def test_hilbert_points_match_turtle_recursion(level):
+    t = RecordingTurtle()
+    hilbert_a(level, 1, t)
+    expected = np.array(t.strokes[0], dtype=float)
+
+    np.testing.assert_allclose(hilbert_points(level, 2 ** level - 1), expected, atol=1e-9)
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from lsystem import l_system_chunk_segments, l_system_segments
+from lsystem_engine import expand_l_system, iter_l_system
+
+PLANT = ("X", {"F": "FF", "X": "F+[[X]-X]-F[-FX]+X"}, 4)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 100000])
+def test_chunked_segments_match_whole_string(chunk_size):
+    string = expand_l_system(*PLANT)
+    expected = l_system_segments(string, 25, 5)
+
+    symbols = "".join(iter_l_system(*PLANT))
+    pieces, state = [], None
+    for start in range(0, len(symbols), chunk_size):
+        piece, state = l_system_chunk_segments(symbols[start:start + chunk_size], 25, 5, state)
+        pieces.append(piece)
+    np.testing.assert_allclose(np.concatenate(pieces), expected, atol=1e-9)
+
+
+def test_chunk_cannot_close_unopened_branch():
+    _, state = l_system_chunk_segments("F[+F", 90, 1)
+    l_system_chunk_segments("]", 90, 1, state)
+    with pytest.raises(ValueError):
+        l_system_chunk_segments("]]", 90, 1, state)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from mandelbrot import compute_mandelbrot, mandelbrot, mandelbrot_grid
+
+# Boundary-heavy views, where last-bit rounding differences change the counts
+VIEWS = [
+    ((-0.75, -0.74), (0.1, 0.11), 1000),
+    ((-0.7436, -0.7434), (0.1317, 0.1319), 5000),
+]
+
+
+def scalar_image(x, y, max_iter, shortcuts):
+    return np.array([[mandelbrot(complex(a, b), max_iter, shortcuts) for a in x] for b in y])
+
+
+@pytest.mark.parametrize('x_range, y_range, max_iter', VIEWS)
+@pytest.mark.parametrize('shortcuts', [False, True])
+def test_grid_matches_scalar_bit_for_bit(x_range, y_range, max_iter, shortcuts):
+    x = np.linspace(*x_range, 60)
+    y = np.linspace(y_range[1], y_range[0], 45)
+    expected = scalar_image(x, y, max_iter, shortcuts=False)
+    assert np.array_equal(mandelbrot_grid(x, y, max_iter, shortcuts), expected)
+    assert np.array_equal(scalar_image(x, y, max_iter, shortcuts), expected)
+
+
+def test_tiled_matches_untiled():
+    x_range, y_range, max_iter = VIEWS[0]
+    image = compute_mandelbrot(x_range, y_range, 120, 90, max_iter)
+    assert np.array_equal(compute_mandelbrot(x_range, y_range, 120, 90, max_iter, tiled=True), image)
@@ -0,0 +1,102 @@
+import math
+
+import numpy as np
+import pytest
+
+from gcode_writer import compute_scale, machine_coordinates
+from recording_turtle import RecordingTurtle
+
+
+def circle_drawing():
+    t = RecordingTurtle()
+    t.forward(100)
+    t.circle(30)
+    t.left(37)
+    t.forward(50)
+    t.circle(-45.5)
+    t.right(90)
+    t.forward(20)
+    t.circle(12.3, 135)
+    return t
+
+
+def test_circle_without_steps_is_recorded_as_arc():
+    t = RecordingTurtle()
+    t.circle(50)
+    assert list(t.arcs) == [0]
+    assert t.arcs[0].centre == pytest.approx((0.0, 50.0))
+    assert (t.arcs[0].radius, t.arcs[0].extent) == (50, 360.0)
+    gcode = t.write_gcode(100, 100).splitlines()
+    assert gcode == ["G0 X50.000 Y0.000", "G3 X50.000 Y0.000 I0.000 J50.000"]
+
+
+def test_circle_with_steps_stays_a_polygon():
+    t = RecordingTurtle()
+    t.circle(50, steps=12)
+    assert t.arcs == {}
+    assert len(t.strokes[0]) == 13
+
+
+def test_arcs_fit_the_drawing_by_the_true_circle():
+    t = RecordingTurtle()
+    t.circle(10)
+    info = compute_scale(t.strokes, 100, 100, arcs=t.arcs)
+    # The polygon is inscribed in the circle, the circle itself must fill the area
+    assert info.scale == pytest.approx(5.0)
+
+
+@pytest.mark.parametrize('radius, extent', [(20, 90), (-20, 200), (15, -135), (-7, -400), (12, 725)])
+def test_arc_moves_end_on_the_arc_with_the_centre_offset(radius, extent):
+    t = RecordingTurtle()
+    t.setheading(20)
+    t.circle(radius, extent)
+    arc = t.arcs[0]
+    info = compute_scale(t.strokes, 300, 100, allow_rotation=True, arcs=t.arcs)
+    command, x, y, i, j = t.write_gcode(300, 100, allow_rotation=True).splitlines()[-1].split()
+
+    start, end = machine_coordinates([t.strokes[0][0], t.strokes[0][-1]], info)
+    centre = machine_coordinates([arc.centre], info)[0]
+    assert command == ('G3' if (radius > 0) == (extent > 0) else 'G2')
+    assert (float(x[1:]), float(y[1:])) == pytest.approx(tuple(end), abs=2e-3)
+    assert (float(i[1:]), float(j[1:])) == pytest.approx(tuple(centre - start), abs=2e-3)
+
+
+def test_matches_turtle_gcode_for_circles():
+    tg = pytest.importorskip('turtle_gcode')
+    t = RecordingTurtle()
+    moves = []
+
+    def line(distance):
+        start = t.position()
+        t.forward(distance)
+        moves.append(tg.LinearMove(start, t.position()))
+
+    def circle(radius):
+        start = t.position()
+        angle = math.radians(t.heading()) + math.pi / 2
+        centre = (start[0] + radius * math.cos(angle), start[1] + radius * math.sin(angle))
+        t.circle(radius)
+        moves.append(tg.CircleMove(start, t.position(), centre, radius, math.tau, None))
+
+    line(100)
+    circle(30)
+    t.left(37)
+    line(50)
+    circle(-45.5)
+    t.right(90)
+    line(20)
+    circle(12.3)
+
+    # turtle_gcode.Turtle.write_gcode only reads the recorded moves, so no Tk window is needed
+    reference = tg.Turtle.__new__(tg.Turtle)
+    reference._gcode_moves = moves
+    for width, height in ((200, 200), (300, 120)):
+        assert t.write_gcode(width, height, penup_command="M03", pendown_command="M05") == \
+            reference.write_gcode(width, height, penup_command="M03", pendown_command="M05")
+
+
+def test_strokes_after_an_arc_continue_without_travel():
+    t = circle_drawing()
+    gcode = t.write_gcode(200, 200, penup_command="M03", pendown_command="M05")
+    assert "M03" not in gcode
+    assert np.allclose(t.strokes[1][0], t.strokes[0][-1])
@@ -0,0 +1,33 @@
+import numpy as np
+
+from simplify import thin_by_density
+
+SQUARE = [(0, 0), (100, 0), (100, 100), (0, 100), (0, 0)]
+
+
+def has_segment(polylines, start, end):
+    for points in polylines:
+        for a, b in zip(points[:-1].tolist(), points[1:].tolist()):
+            if {tuple(a), tuple(b)} == {start, end}:
+                return True
+    return False
+
+
+def test_thin_keeps_long_segment_between_inked_vertices():
+    # The diagonal joins two inked corners of the square but lays fresh ink
+    stroke = [(50, -50), (0, 0), (100, 100), (0, 100), (50, 150)]
+    thinned, report = thin_by_density([SQUARE, stroke], 1)
+
+    assert has_segment(thinned, (0.0, 0.0), (100.0, 100.0))
+    # Only the top edge of the square is redrawn, the pen is lifted over it
+    assert not has_segment(thinned[1:], (100.0, 100.0), (0.0, 100.0))
+    assert report['strokes_after'] == 3
+
+
+def test_thin_lifts_pen_over_retraced_path():
+    line = np.column_stack([np.linspace(0, 500, 51), np.zeros(51)])
+    retrace = np.vstack([[(0, -10)], line[::-1], [(-10, 0)]])
+    thinned, report = thin_by_density([line, retrace], 1)
+
+    assert report['strokes_after'] == 3
+    assert report['points_after'] < report['points_before']
@@ -0,0 +1,67 @@
+import concurrent.futures
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+def _render_tile(shm_name, shape, dtype, grid_func, x, y, max_iter, row, col):
+    """
+    Renders one tile in a worker process and writes it straight into the shared image.
+
+    Parameters:
+    shm_name (str): Name of the shared memory block holding the image.
+    shape (tuple): Shape of the full image.
+    dtype (str): Data type of the full image.
+    grid_func (callable): Function (x, y, max_iter) -> iteration-count array.
+    x (np.array): Real coordinates of the tile columns.
+    y (np.array): Imaginary coordinates of the tile rows.
+    max_iter (int): The maximum number of iterations.
+    row (int): Row of the top left pixel of the tile in the full image.
+    col (int): Column of the top left pixel of the tile in the full image.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        image = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        image[row:row + len(y), col:col + len(x)] = grid_func(x, y, max_iter)
+        del image # Release the view before closing the block
+    finally:
+        shm.close()
+
+def render_tiled(grid_func, x, y, max_iter, tile_size=128, workers=None, dtype=np.int64):
+    """
+    Renders an escape-time fractal by splitting the image into square tiles and
+    computing them in a process pool. Tiles are written into a shared memory
+    array, so only the tile coordinates travel between processes.
+
+    Parameters:
+    grid_func (callable): Module level function (x, y, max_iter) -> iteration-count array.
+    x (np.array): Real coordinates of the image columns.
+    y (np.array): Imaginary coordinates of the image rows.
+    max_iter (int): The maximum number of iterations.
+    tile_size (int): Width and height of a tile in pixels.
+    workers (int): Number of worker processes (default: all cores).
+
+    Returns:
+    np.array: (len(y), len(x)) array of iteration counts.
+    """
+    shape = (len(y), len(x))
+    dtype = np.dtype(dtype)
+    workers = workers or os.cpu_count()
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_render_tile, shm.name, shape, dtype.str, grid_func,
+                                x[col:col + tile_size], y[row:row + tile_size], max_iter, row, col)
+                for row in range(0, shape[0], tile_size)
+                for col in range(0, shape[1], tile_size)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                future.result() # Re-raise errors from the workers
+
+        image = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return image